@@ -0,0 +1,112 @@
+import copy
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def version_key(user_id):
+    return f'cookscorner:auth-user:{user_id}'
+
+
+def new_version():
+    return secrets.token_hex(8)
+
+
+def get_version(user_id):
+    """
+    The user's version stamp. Every change stores a new random one, and a stamp lost by the cache
+    is replaced by a new one too, so a stamp never stands for two different states of the user.
+    """
+    cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+class UserCache:
+    """
+    Bounded LRU of authenticated users, keyed by user id and checked against a per-user
+    version kept in the shared cache.
+
+    Entries also expire after AUTH_USER_CACHE_TTL seconds, which bounds how long a change
+    (e.g. deactivation) goes unseen when the version cache is not shared between processes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            user, entry_version, expires_at = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Views may modify request.user, the cached instance has to stay untouched.
+        return copy.copy(user)
+
+    def set(self, user_id, version, user):
+        with self.lock:
+            self.entries[user_id] = (copy.copy(user), version, time.monotonic() + settings.AUTH_USER_CACHE_TTL)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached user in every process sharing the version cache, once the current transaction commits.
+    """
+    def bump():
+        caches[settings.AUTH_USER_CACHE_ALIAS].set(version_key(user_id), new_version(), timeout=None)
+        user_cache.discard(user_id)
+
+    transaction.on_commit(bump)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication serving the user from `user_cache` instead of querying it on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        # Read before the user is loaded, so an invalidation racing with the load is not lost.
+        version = get_version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, version, user)
+        elif api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        # The stamp the user was checked against, e.g. for the viewer's ETags (cooks_corner.viewer_state).
+        user.cache_version = version
+        return user
@@ -0,0 +1,94 @@
+import hashlib
+import math
+import threading
+import time
+import numpy as np
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+def get_hashes(jti):
+    digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BlacklistFilter:
+    """
+    Per-process Bloom filter of the JTIs of the blacklisted, unexpired refresh tokens.
+
+    A miss means the token is not blacklisted, so the database is only asked about possible
+    positives. Tokens blacklisted in this process are added right away; those blacklisted in
+    other processes are read by id every BLACKLIST_FILTER_REFRESH_SECONDS. gunicorn workers build
+    it at startup (gunicorn.conf.py), before serving requests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built = False
+        self.bits = np.zeros(0, dtype=bool)
+        self.hash_count = 1
+        self.capacity = 0
+        self.count = 0
+        self.last_id = 0
+        self.checked_at = 0.0
+
+    def build(self):
+        with self.lock:
+            rows = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow())
+            self.last_id = BlacklistedToken.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            jtis = list(rows.filter(pk__lte=self.last_id).values_list('token__jti', flat=True).iterator(chunk_size=10000))
+            self.allocate(max(settings.BLACKLIST_FILTER_CAPACITY, 2 * len(jtis)))
+            for jti in jtis:
+                self.insert(jti)
+            self.built = True
+            self.checked_at = time.monotonic()
+
+    def allocate(self, capacity):
+        # Optimal size and hash count for `capacity` entries at BLACKLIST_FILTER_ERROR_RATE false positives.
+        size = math.ceil(-capacity * math.log(settings.BLACKLIST_FILTER_ERROR_RATE) / math.log(2) ** 2)
+        self.bits = np.zeros(size, dtype=bool)
+        self.hash_count = max(1, round(size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+
+    def refresh(self):
+        rows = list(
+            BlacklistedToken.objects.filter(pk__gt=self.last_id).order_by('pk').values_list('pk', 'token__jti')
+        )
+        with self.lock:
+            for pk, jti in rows:
+                self.insert(jti)
+                self.last_id = max(self.last_id, pk)
+            self.checked_at = time.monotonic()
+        if self.count > self.capacity:
+            # Past capacity the error rate climbs; rebuilding also drops the expired tokens.
+            self.build()
+
+    def positions(self, jti):
+        first, second = get_hashes(jti)
+        return [(first + i * second) % len(self.bits) for i in range(self.hash_count)]
+
+    def insert(self, jti):
+        self.bits[self.positions(jti)] = True
+        self.count += 1
+
+    def add(self, jti):
+        with self.lock:
+            if self.built:
+                self.insert(jti)
+
+    def might_contain(self, jti):
+        with self.lock:
+            return bool(self.bits[self.positions(jti)].all())
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def get_filter():
+    if not blacklist_filter.built:
+        blacklist_filter.build()
+    elif time.monotonic() - blacklist_filter.checked_at > settings.BLACKLIST_FILTER_REFRESH_SECONDS:
+        blacklist_filter.refresh()
+    return blacklist_filter
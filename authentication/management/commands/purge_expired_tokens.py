@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries in small batches, '
+        'each in its own short transaction, instead of one long delete like flushexpiredtokens.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches.')
+
+    def handle(self, *args, **options):
+        now = aware_utcnow()
+        last_id, deleted = 0, 0
+        while True:
+            token_ids = list(
+                OutstandingToken.objects.filter(pk__gt=last_id, expires_at__lte=now)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not token_ids:
+                break
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=token_ids).delete()
+                deleted += OutstandingToken.objects.filter(pk__in=token_ids).delete()[1].get(OutstandingToken._meta.label, 0)
+            last_id = token_ids[-1]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired token(s).'))
@@ -0,0 +1,8 @@
+from authentication.models import User
+from cooks_corner.management.counters_command import CounterSyncCommand
+
+
+class Command(CounterSyncCommand):
+    help = 'Rebuild the follower, following and recipe counters of user profiles from the Follow and Recipe tables.'
+    model = User
+    label = 'profile'
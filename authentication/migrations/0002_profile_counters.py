@@ -0,0 +1,54 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    Follow = apps.get_model('cooks_corner', 'Follow')
+    Recipe = apps.get_model('cooks_corner', 'Recipe')
+
+    def count_of(model, relation):
+        counts = (
+            model.objects.filter(**{relation: OuterRef('pk')})
+            .order_by()
+            .values(relation)
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return Coalesce(Subquery(counts), Value(0))
+
+    User.objects.update(
+        followers_count=count_of(Follow, 'followed'),
+        following_count=count_of(Follow, 'follower'),
+        recipes_count=count_of(Recipe, 'author'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('cooks_corner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:15
+
+import cooks_corner.images
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=cooks_corner.images.get_image_storage, upload_to='user_photos/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_alter_user_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='staged_photo',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from cooks_corner.images import get_image_storage
 
 
 class SuperUser(BaseUserManager):
@@ -31,24 +32,32 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=255)
     user_bio = models.CharField(max_length=255, blank=True, null=True)
-    photo = models.ImageField(upload_to='user_photos/', blank=True, null=True)
+    photo = models.ImageField(upload_to='user_photos/', storage=get_image_storage, blank=True, null=True)
+    # Uploaded photo waiting for the ingestion worker (cooks_corner.images), the current one is kept until then.
+    staged_photo = models.CharField(max_length=255, blank=True, editable=False)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_superuser = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
+    # Denormalized counters, maintained by the follow views and recipe signals.
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    recipes_count = models.PositiveIntegerField(default=0)
+    # Row version for conditional GETs; counter writes bump it explicitly.
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = "email"
 
     objects = SuperUser()
 
     def count_followers(self):
-        return self.followers.count()
+        return self.followers_count
 
     def count_following(self):
-        return self.following.count()
+        return self.following_count
 
     def count_recipes(self):
-        return self.recipes.count()
+        return self.recipes_count
     
     def __str__(self):
         return f"{self.email}"
\ No newline at end of file
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from authentication.models import User
+from authentication.tokens import FilteredRefreshToken
 
 
 
@@ -43,6 +45,10 @@ class LogoutSerializer(serializers.Serializer):
     refresh_token = serializers.CharField()
 
 
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
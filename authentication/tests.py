@@ -1,3 +1,142 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from authentication.authentication import get_version, user_cache, version_key
+from authentication.blacklist import BlacklistFilter, blacklist_filter
+from authentication.models import User
 
-# Create your tests here.
+
+def make_user(name):
+    return User.objects.create_user(username=name, email=f'{name}@example.com', password='password123')
+
+
+def make_token(user, jti, expires_at):
+    return OutstandingToken.objects.create(user=user, jti=jti, token=jti, expires_at=expires_at)
+
+
+class AuthTestCase(APITestCase):
+    def setUp(self):
+        caches[settings.AUTH_USER_CACHE_ALIAS].clear()
+        user_cache.entries.clear()
+        self.user = make_user('reader')
+
+    def login(self):
+        response = self.client.post('/cookscorner/users/login/', {'email': self.user.email, 'password': 'password123'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+
+class UserCacheTests(AuthTestCase):
+    def test_cached_user_invalidated_on_save(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        url = f'/cookscorner/users/profile/{self.user.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertIn(self.user.pk, user_cache.entries)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertNotIn(self.user.pk, user_cache.entries)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_version_shared_between_processes(self):
+        tokens = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        url = f'/cookscorner/users/profile/{self.user.pk}/'
+        self.client.get(url)
+
+        # Another process deactivates the user: only the shared version changes here.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        caches[settings.AUTH_USER_CACHE_ALIAS].set(version_key(self.user.pk), 'changed')
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_lost_version_is_replaced(self):
+        version = get_version(self.user.pk)
+        caches[settings.AUTH_USER_CACHE_ALIAS].delete(version_key(self.user.pk))
+        # A new stamp, never the one of an earlier state of the user.
+        self.assertNotEqual(get_version(self.user.pk), version)
+        self.assertEqual(get_version(self.user.pk), get_version(self.user.pk))
+
+
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        self.user = make_user('reader')
+
+    @override_settings(BLACKLIST_FILTER_CAPACITY=1000)
+    def test_build(self):
+        now = aware_utcnow()
+        BlacklistedToken.objects.create(token=make_token(self.user, 'active', now + timedelta(days=1)))
+        BlacklistedToken.objects.create(token=make_token(self.user, 'expired', now - timedelta(days=1)))
+
+        bloom = BlacklistFilter()
+        bloom.build()
+        self.assertTrue(bloom.might_contain('active'))
+        # Expired tokens are rejected by their exp claim already.
+        self.assertFalse(bloom.might_contain('expired'))
+        false_positives = sum(bloom.might_contain(f'jti-{i}') for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    @override_settings(BLACKLIST_FILTER_CAPACITY=1000)
+    def test_refresh_reads_other_processes(self):
+        bloom = BlacklistFilter()
+        bloom.build()
+        bloom.add('local')
+        BlacklistedToken.objects.create(token=make_token(self.user, 'remote', aware_utcnow() + timedelta(days=1)))
+        self.assertTrue(bloom.might_contain('local'))
+        self.assertFalse(bloom.might_contain('remote'))
+
+        bloom.refresh()
+        self.assertTrue(bloom.might_contain('remote'))
+
+    @override_settings(BLACKLIST_FILTER_CAPACITY=2)
+    def test_grows_past_capacity(self):
+        bloom = BlacklistFilter()
+        bloom.build()
+        for i in range(3):
+            BlacklistedToken.objects.create(token=make_token(self.user, f'jti-{i}', aware_utcnow() + timedelta(days=1)))
+        bloom.refresh()
+        self.assertEqual(bloom.capacity, 6)
+        self.assertTrue(all(bloom.might_contain(f'jti-{i}') for i in range(3)))
+
+
+class PurgeExpiredTokensTests(TestCase):
+    def test_purge(self):
+        user = make_user('reader')
+        now = aware_utcnow()
+        active = make_token(user, 'active', now + timedelta(days=1))
+        for i in range(5):
+            token = make_token(user, f'expired-{i}', now - timedelta(days=1))
+            if i % 2:
+                BlacklistedToken.objects.create(token=token)
+        BlacklistedToken.objects.create(token=active)
+
+        out = io.StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+        self.assertIn('Purged 5 expired token(s).', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['active'])
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token__jti', flat=True)), ['active'])
+
+
+class LogoutTests(AuthTestCase):
+    def setUp(self):
+        super().setUp()
+        blacklist_filter.built = False
+
+    def test_logout_blacklists_refresh_token(self):
+        tokens = self.login()
+        self.assertEqual(self.client.post('/cookscorner/users/login/refresh/', {'refresh': tokens['refresh']}).status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+        response = self.client.post('/cookscorner/users/logout/', {'refresh_token': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+        self.client.credentials()
+        self.assertEqual(self.client.post('/cookscorner/users/login/refresh/', {'refresh': tokens['refresh']}).status_code, 401)
+        self.assertTrue(blacklist_filter.might_contain(OutstandingToken.objects.get(token=tokens['refresh']).jti))
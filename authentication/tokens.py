@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.blacklist import blacklist_filter, get_filter
+
+
+class FilteredRefreshToken(RefreshToken):
+    """
+    RefreshToken checking the blacklist filter before the blacklist table.
+    """
+
+    def check_blacklist(self):
+        if get_filter().might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
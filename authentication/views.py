@@ -1,7 +1,11 @@
+from authentication.authentication import invalidate_user
 from authentication.models import User
 from authentication.permissions import IsOwnerOrReadOnly
+from authentication.tokens import FilteredRefreshToken
+from cooks_corner import images
 from cooks_corner.pagination import CustomPagination
 from cooks_corner.filters import UserFilter
+from cooks_corner.conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -16,6 +20,7 @@ from authentication.serializers import (
     UserSerializer, 
     UserProfileSerializer, 
     LogoutSerializer, 
+    FilteredTokenRefreshSerializer,
 )
 
 
@@ -85,14 +90,15 @@ class LogoutView(generics.GenericAPIView):
         refresh_token = serializer.validated_data["refresh_token"]
 
         try:
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
+            invalidate_user(request.user.pk)
             return Response({"message": "You have successfully logged out."}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": f"Unable to log out {e}."}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProfileView(generics.RetrieveAPIView):
+class ProfileView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
 
@@ -103,12 +109,18 @@ class ProfileView(generics.RetrieveAPIView):
         except User.DoesNotExist:
             return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
+    def get_object_version(self):
+        return User.objects.filter(id=self.kwargs.get('user_id')).values_list('updated_at', 'id').first()
+
     def get(self, request, *args, **kwargs):
         """
         Profile of user.
 
         Profile of user with the provided information. This endpoint expects a payload containing user details.
         """
+        return super().get(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
         user = self.get_object()
         if isinstance(user, Response):  # Check if get_object returned an error response
             return user
@@ -116,9 +128,10 @@ class ProfileView(generics.RetrieveAPIView):
         serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class ProfilesList(generics.ListAPIView):
-    queryset = User.objects.all().order_by('id') 
+class ProfilesList(ConditionalListMixin, generics.ListAPIView):
+    queryset = User.objects.all().order_by('id')
     pagination_class = CustomPagination
+    cursor_ordering = ('id',)
     parser_classes = (MultiPartParser, FormParser)
     filter_backends = [DjangoFilterBackend]
     filterset_class = UserFilter
@@ -131,15 +144,7 @@ class ProfilesList(generics.ListAPIView):
 
         List of the Profiles of users with the provided information. This endpoint expects a payload containing username details.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return super().get(request, *args, **kwargs)
 
 
 class ProfileUpdateView(generics.GenericAPIView):
@@ -158,13 +163,23 @@ class ProfileUpdateView(generics.GenericAPIView):
         serializer = UserProfileSerializer(user, data=request.data)
 
         if serializer.is_valid():
+            photo = serializer.validated_data.pop('photo', None)
             serializer.save()
-            return Response({'message': 'User updated successfully!'}, status.HTTP_200_OK)
+            if photo is None:
+                return Response({'message': 'User updated successfully!'}, status.HTTP_200_OK)
+
+            # The current photo is kept until the worker pool has processed the new one.
+            staged_name = images.stage_upload(photo, 'user_photos')
+            # Recorded so process_pending_images finds it if the worker pool loses the task.
+            User.objects.filter(pk=user.pk).update(staged_photo=staged_name)
+            images.enqueue(images.ingest_profile_photo, user.pk, staged_name)
+            return Response({'message': 'User updated successfully!', 'photo_status': 'pending'}, status.HTTP_200_OK)
         else:
             return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
 class TokenRefreshView(TokenRefreshView):
+    serializer_class = FilteredTokenRefreshSerializer
 
     def post(self, *args, **kwargs):
         """
@@ -0,0 +1,133 @@
+import functools
+import hashlib
+import os
+import threading
+from importlib import metadata
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import quote_etag
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer, SwaggerYAMLRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.response import Response
+from cooks_corner.conditional import is_not_modified
+
+
+info = openapi.Info(
+    title="Cookscorner API",
+    default_version='v1',
+    description="API Cookscorner предоставляет доступ к различным запросам, требующим аутентификации "
+                "с помощью токена Bearer. "
+                "Для аутентификации включите 'Bearer {access_token}' в заголовок 'Authorization'.",
+    terms_of_service="https://www.google.com/policies/terms/",
+)
+
+schema_view = get_schema_view(
+    info,
+    public=True,
+    permission_classes=[permissions.AllowAny],
+)
+
+# artifact extension -> codec
+CODECS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+# spec renderer of schema_view -> artifact extension; the view uses subclasses carrying its validators.
+SPEC_RENDERERS = (
+    (OpenAPIRenderer, 'json'),
+    (SwaggerJSONRenderer, 'json'),
+    (SwaggerYAMLRenderer, 'yaml'),
+)
+
+
+def get_spec_extension(renderer):
+    return next((extension for cls, extension in SPEC_RENDERERS if isinstance(renderer, cls)), None)
+artifacts = {}
+artifacts_lock = threading.Lock()
+
+
+@functools.cache
+def get_code_version():
+    """
+    SCHEMA_CODE_VERSION when set (e.g. the deployed commit), otherwise a hash of the project's
+    Python sources and of the versions of the packages the schema is generated with.
+    """
+    if settings.SCHEMA_CODE_VERSION:
+        return settings.SCHEMA_CODE_VERSION
+    digest = hashlib.sha1()
+    for package in ('Django', 'djangorestframework', 'drf-yasg', 'django-filter'):
+        digest.update(f'{package}={metadata.version(package)}\n'.encode())
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(__file__).resolve().parent}
+    roots.update(Path(config.path).resolve() for config in apps.get_app_configs())
+    for root in sorted(root for root in roots if root.is_relative_to(base_dir)):
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def get_artifact_path(version, extension):
+    return os.path.join(settings.SCHEMA_ROOT, f'openapi-{version}.{extension}')
+
+
+def generate_schema():
+    # Without a request the schema has no host or schemes, so it holds for every host serving it.
+    generator = schema_view.generator_class(info)
+    schema = generator.get_schema(request=None, public=True)
+    return {extension: codec([]).encode(schema) for extension, codec in CODECS.items()}
+
+
+def write_schema(version):
+    os.makedirs(settings.SCHEMA_ROOT, exist_ok=True)
+    encoded = generate_schema()
+    for extension, content in encoded.items():
+        path = get_artifact_path(version, extension)
+        # Written aside and renamed, so other workers never read a partial file.
+        with open(f'{path}.{os.getpid()}.tmp', 'wb') as file:
+            file.write(content)
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
+    return encoded
+
+
+def get_schema_artifact(extension):
+    """
+    The encoded schema of the running code: from memory, else from the artifact written by
+    `manage.py generate_schema` (or by another worker), else generated and written now.
+    """
+    version = get_code_version()
+    with artifacts_lock:
+        if (version, extension) not in artifacts:
+            try:
+                with open(get_artifact_path(version, extension), 'rb') as file:
+                    artifacts[version, extension] = file.read()
+            except FileNotFoundError:
+                for generated_extension, content in write_schema(version).items():
+                    artifacts[version, generated_extension] = content
+        return artifacts[version, extension]
+
+
+class CachedSchemaView(schema_view):
+    """
+    schema_view serving the JSON and YAML specs from get_schema_artifact, with an ETag
+    derived from the code version. The Swagger UI and ReDoc pages are rendered without
+    generating anything: they only show the title and version and fetch the spec themselves.
+    """
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        extension = get_spec_extension(renderer)
+        if extension is None:
+            version = request.version or version or ''
+            return Response(openapi.Swagger(info=info, _prefix='/', _version=version, paths=openapi.Paths(paths={})))
+
+        headers = {'ETag': quote_etag(f'{get_code_version()}-{extension}'), 'Cache-Control': 'no-cache'}
+        if is_not_modified(request, headers['ETag']):
+            return HttpResponse(status=304, headers=headers)
+        content_type = f'{renderer.media_type}; charset=utf-8'
+        return HttpResponse(get_schema_artifact(extension), content_type=content_type, headers=headers)
@@ -52,11 +52,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that its timings cover the whole request
+    'cooks_corner.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After authentication, so that staff sessions can ask for profiles too
+    'cooks_corner.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -107,6 +111,21 @@ else:
         }
     }
 
+# Cache
+# Local memory by default, which only suits a single process: the response cache versions and the
+# authenticated user cache stamps have to be shared between workers. docker-compose.yml uses the
+# database cache; CACHE_BACKEND/CACHE_LOCATION can point at redis instead (checked by cooks_corner.W001).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='cookscorner'),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+# Entries are invalidated through version bumps; the timeout only bounds memory use.
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -167,6 +186,20 @@ CLOUDINARY_STORAGE = {
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# Image ingestion: uploads are staged on local disk and processed by a per-process worker pool
+# before being pushed to IMAGE_STORAGE (use django.core.files.storage.FileSystemStorage for tests).
+# The pool runs inside the web processes (see cooks_corner.images.enqueue): decoding and resizing
+# compete with requests for CPU, and a restart drops the queued uploads, which docker-compose.yml
+# recovers with process_pending_images before gunicorn starts.
+IMAGE_STORAGE = config('IMAGE_STORAGE', default=DEFAULT_FILE_STORAGE)
+IMAGE_STAGING_ROOT = config('IMAGE_STAGING_ROOT', default=os.path.join(BASE_DIR, 'staging'))
+# 0 processes uploads inline after commit instead of in background threads.
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=2, cast=int)
+IMAGE_MAX_SIZE = config('IMAGE_MAX_SIZE', default=2048, cast=int)
+# Downscaled copies (WebP + JPEG) generated for responsive images, in pixels of width.
+IMAGE_VARIANT_WIDTHS = (160, 480, 1080)
+IMAGE_THUMBNAIL_WIDTH = 480
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
 CSRF_TRUSTED_ORIGINS = [config('TRUST_ORIGIN')]
@@ -190,7 +223,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ],
     'DATETIME_FORMAT': '%d.%m.%Y %H:%M',
     'DATE_FORMAT': '%d.%m.%Y',
@@ -198,6 +231,87 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# feed
+# New recipes are pulled into their author's followers' feeds at read time until `fan_out_recipes`
+# pushes them into the timelines. Recipes of authors with more followers than this stay pulled.
+FEED_FANOUT_LIMIT = config('FEED_FANOUT_LIMIT', default=5000, cast=int)
+# Number of an author's latest recipes copied into a timeline when following them.
+FEED_BACKFILL_SIZE = config('FEED_BACKFILL_SIZE', default=20, cast=int)
+
+# trending
+# Likes and saves lose half of their weight every TRENDING_HALF_LIFE_HOURS.
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+TRENDING_WEIGHTS = {'likes': 1.0, 'saves': 2.0}
+# Reference time of the stored scores (2024-01-01 UTC); changing it or the half-life requires update_trending_scores --full.
+TRENDING_EPOCH = 1704067200
+# Age before incremental runs (trending, similar recipes) take likes and saves into account, so that
+# the transactions with lower ids have committed by then. Longer than any transaction writing them, plus the clock skew between app servers.
+EVENT_SETTLE_SECONDS = config('EVENT_SETTLE_SECONDS', default=60, cast=int)
+
+# similar recipes
+# Neighbours kept per recipe by update_similar_recipes.
+SIMILAR_RECIPES_COUNT = config('SIMILAR_RECIPES_COUNT', default=20, cast=int)
+
+# ingredient finder
+# How often a process re-reads recipes changed by other processes into its ingredient index.
+INGREDIENT_INDEX_REFRESH_SECONDS = config('INGREDIENT_INDEX_REFRESH_SECONDS', default=5, cast=int)
+
+# batch endpoints
+# Maximum number of ids accepted by the batch like/save/follow endpoints.
+BATCH_MAX_SIZE = config('BATCH_MAX_SIZE', default=100, cast=int)
+
+# authenticated user cache
+# Users are kept per process for at most AUTH_USER_CACHE_TTL seconds; profile changes drop them
+# everywhere through a version stamp in the AUTH_USER_CACHE_ALIAS cache, which has to be shared
+# between processes (e.g. redis) for that. Otherwise the TTL bounds how long e.g. a deactivation goes unseen.
+AUTH_USER_CACHE_ALIAS = config('AUTH_USER_CACHE_ALIAS', default='default')
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1000, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+
+# token blacklist filter
+# Bloom filter of blacklisted refresh tokens, sized for BLACKLIST_FILTER_CAPACITY tokens and grown past it.
+# Tokens blacklisted by another process may still be refreshed for up to BLACKLIST_FILTER_REFRESH_SECONDS.
+BLACKLIST_FILTER_CAPACITY = config('BLACKLIST_FILTER_CAPACITY', default=100000, cast=int)
+BLACKLIST_FILTER_ERROR_RATE = config('BLACKLIST_FILTER_ERROR_RATE', default=0.01, cast=float)
+BLACKLIST_FILTER_REFRESH_SECONDS = config('BLACKLIST_FILTER_REFRESH_SECONDS', default=5, cast=int)
+
+# metrics
+# /cookscorner/metrics/ only sees the worker answering it unless the PROMETHEUS_MULTIPROC_DIR
+# environment variable points every worker at the same empty directory (see docker-compose.yml).
+
+# profiling
+# Profiles requested by staff (X-Profile header or ?profile=cprofile|sample) and randomly sampled ones are stored here.
+PROFILING_ROOT = config('PROFILING_ROOT', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=200, cast=int)
+# Seconds between two stack samples of the sampling profiler.
+PROFILING_INTERVAL = config('PROFILING_INTERVAL', default=0.005, cast=float)
+# 1 in PROFILING_SAMPLE_RATE requests is sampled (0 disables), as long as sampled requests took at most
+# PROFILING_MAX_SHARE of the process uptime.
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0, cast=int)
+PROFILING_MAX_SHARE = config('PROFILING_MAX_SHARE', default=0.01, cast=float)
+
+# OpenAPI schema
+# Generated once per code version (`manage.py generate_schema` at deploy, or on the first request) and kept here.
+SCHEMA_ROOT = config('SCHEMA_ROOT', default=os.path.join(BASE_DIR, 'schema'))
+# Deployed revision, e.g. the git commit; by default a hash of the project sources.
+SCHEMA_CODE_VERSION = config('SCHEMA_CODE_VERSION', default='')
+
+# data export
+# Rows fetched per round trip of the export's server-side cursor (and per prefetch of recipe ingredients and images).
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# periodic tasks
+# (interval in seconds, management command, arguments) run by `manage.py run_periodic_tasks`,
+# the worker-cooks service of docker-compose.yml, outside the web processes.
+PERIODIC_TASKS = [
+    (10, 'fan_out_recipes', []),
+    (300, 'update_trending_scores', []),
+    # Drops removed likes and saves, and adds the events incremental runs missed.
+    (24 * 3600, 'update_trending_scores', ['--full']),
+    (600, 'update_similar_recipes', []),
+    (24 * 3600, 'update_similar_recipes', ['--full']),
+]
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),  # Пример: установите время жизни токена
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=30),  # Пример: установите время жизни для обновления токена
@@ -16,27 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include, re_path
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Cookscorner API",
-      default_version='v1',
-      description="API Cookscorner предоставляет доступ к различным запросам, требующим аутентификации "
-                  "с помощью токена Bearer. "
-                  "Для аутентификации включите 'Bearer {access_token}' в заголовок 'Authorization'.",
-      terms_of_service="https://www.google.com/policies/terms/",
-   ),
-   public=True,
-   permission_classes=[permissions.AllowAny],
-)
+from config.schema import CachedSchemaView
 
 urlpatterns = [
-    re_path(r'^cookscorner/swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    re_path(r'^cookscorner/swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    re_path(r'^cookscorner/swagger(?P<format>\.json|\.yaml)$', CachedSchemaView.without_ui(cache_timeout=0), name='schema-json'),
+    re_path(r'^cookscorner/swagger/$', CachedSchemaView.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    re_path(r'^redoc/$', CachedSchemaView.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('cookscorner/users/', include('authentication.urls')),
     path('cookscorner/', include('cooks_corner.urls')),
     path('cookscorner/admin/', admin.site.urls),
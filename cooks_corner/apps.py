@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CooksCornerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cooks_corner'
+
+    def ready(self):
+        from cooks_corner import checks, metrics, signals  # noqa: F401
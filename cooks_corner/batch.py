@@ -0,0 +1,61 @@
+from django.db import transaction
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from cooks_corner.serializers import BatchActionSerializer
+
+
+CREATED = 'created'
+EXISTS = 'exists'
+NOT_FOUND = 'not_found'
+DELETED = 'deleted'
+MISSING = 'missing'
+
+
+class BatchRelationView(generics.GenericAPIView):
+    """
+    Add and remove many (request.user, target) rows of a relation model in one request.
+
+    Existing rows are read once, new ones inserted with a single INSERT ... ON CONFLICT DO NOTHING
+    and removed ones deleted with a single filtered DELETE. Subclasses describe the relation and
+    keep the derived data (counters, feeds) in sync in `on_changed`.
+    """
+    serializer_class = BatchActionSerializer
+    permission_classes = [IsAuthenticated]
+    model = None
+    target_model = None
+    owner_field = None
+    target_field = None
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add, remove = serializer.validated_data['add'], serializer.validated_data['remove']
+        target_id = f'{self.target_field}_id'
+
+        with transaction.atomic():
+            rows = self.model.objects.filter(**{self.owner_field: request.user, f'{target_id}__in': add + remove})
+            linked = set(rows.values_list(target_id, flat=True))
+            found = set(self.target_model.objects.filter(pk__in=add).values_list('pk', flat=True))
+
+            created = [pk for pk in add if pk in found and pk not in linked]
+            self.model.objects.bulk_create(
+                [self.model(**{self.owner_field: request.user, target_id: pk}) for pk in created],
+                ignore_conflicts=True,
+            )
+            deleted = [pk for pk in remove if pk in linked]
+            if deleted:
+                self.model.objects.filter(**{self.owner_field: request.user, f'{target_id}__in': deleted}).delete()
+            if created or deleted:
+                self.on_changed(created, deleted)
+
+        results = []
+        for pk in add:
+            outcome = CREATED if pk in created else EXISTS if pk in linked else NOT_FOUND
+            results.append({'id': pk, 'action': 'add', 'outcome': outcome})
+        for pk in remove:
+            results.append({'id': pk, 'action': 'remove', 'outcome': DELETED if pk in linked else MISSING})
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    def on_changed(self, created, deleted):
+        pass
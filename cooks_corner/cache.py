@@ -0,0 +1,123 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from rest_framework.response import Response
+from cooks_corner.conditional import is_not_modified, not_modified_response
+
+
+KEY_PREFIX = 'cookscorner'
+LIST_NAMESPACE = 'recipes'
+STATS_KEYS = ('hits', 'misses')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def recipe_namespace(recipe_id):
+    return f'recipe:{recipe_id}'
+
+
+def version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def get_versions(*namespaces):
+    """
+    Return the current version of every namespace, creating missing ones.
+
+    New versions start from the current time in milliseconds rather than 1, so a
+    version that was evicted from the cache can never collide with an older one.
+    """
+    cache = get_cache()
+    keys = [version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        key = version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def invalidate_recipes(*recipe_ids):
+    """
+    Invalidate the cached detail pages of the recipes and every cached list page, once the
+    current transaction commits, so a concurrent read cannot cache the old rows under the new version.
+    """
+    namespaces = [recipe_namespace(recipe_id) for recipe_id in recipe_ids] + [LIST_NAMESPACE]
+    transaction.on_commit(lambda: bump_versions(*namespaces))
+
+
+def record(outcome):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:stats:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    cache = get_cache()
+    values = cache.get_many([f'{KEY_PREFIX}:stats:{outcome}' for outcome in STATS_KEYS])
+    return {outcome: values.get(f'{KEY_PREFIX}:stats:{outcome}', 0) for outcome in STATS_KEYS}
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses from the cache under keys built from data versions.
+
+    Writes bump the versions (see `invalidate_recipes`), so entries are never served stale
+    and expire only to free space. Views describe their keys with `get_cache_namespaces`
+    and, for per-request variations such as filters, `get_cache_variant`; `cache_name`
+    and `get_cache_namespaces` are required, which is checked when the view class is defined.
+    """
+    cache_name = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_name is None or not callable(getattr(cls, 'get_cache_namespaces', None)):
+            raise ImproperlyConfigured(f'{cls.__name__} must set cache_name and define get_cache_namespaces().')
+
+    def get_cache_variant(self):
+        return ''
+
+    def get_cache_key(self):
+        versions = get_versions(*self.get_cache_namespaces())
+        parts = [self.cache_name, *map(str, versions), self.request.get_host(), self.get_cache_variant()]
+        digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+        return f'{KEY_PREFIX}:response:{self.cache_name}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key()
+        entry = cache.get(key)
+        if entry is not None:
+            record('hits')
+            data, headers = entry
+            if is_not_modified(request, headers.get('ETag')):
+                return not_modified_response({**headers, 'X-Cache': 'HIT'})
+            return Response(data, headers={**headers, 'X-Cache': 'HIT'})
+
+        response = super().get(request, *args, **kwargs)
+        record('misses')
+        if response.status_code == 200:
+            # Validators are cached with the body so conditional requests are answered on a hit too.
+            headers = {name: response[name] for name in ('ETag', 'Last-Modified') if response.has_header(name)}
+            cache.set(key, (response.data, headers), settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
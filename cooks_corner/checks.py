@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+# Backends keeping their data inside one process.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    # Versions bumped in one worker's memory leave the cached responses and users of the other workers stale.
+    if settings.DEBUG:
+        return []
+    errors = []
+    for setting in ('RESPONSE_CACHE_ALIAS', 'AUTH_USER_CACHE_ALIAS'):
+        backend = settings.CACHES[getattr(settings, setting)]['BACKEND']
+        if backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Warning(
+                f'{setting} uses the process-local {backend}: with several workers, writes only '
+                f'invalidate the entries of the worker handling them.',
+                hint='Set CACHE_BACKEND to a shared backend, e.g. django.core.cache.backends.db.DatabaseCache '
+                     '(with `manage.py createcachetable`) or a redis cache.',
+                id='cooks_corner.W001',
+            ))
+    return errors
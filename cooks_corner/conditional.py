@@ -0,0 +1,94 @@
+import hashlib
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Weak comparison, as required for If-None-Match.
+        etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if last_modified is not None and if_modified_since is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def get_validator_headers(etag, last_modified=None):
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+def not_modified_response(headers):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer GETs of a single object with 304 Not Modified from a cheap row version query,
+    before the object is loaded and serialized.
+
+    Views implement `get_object_version`, returning a tuple whose first item is the
+    object's last modification time, or None when the object does not exist; a view class
+    without it is rejected when it is defined.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, 'get_object_version', None)):
+            raise ImproperlyConfigured(f'{cls.__name__} must define get_object_version().')
+
+    def get(self, request, *args, **kwargs):
+        version = self.get_object_version()
+        if version is None:
+            return super().get(request, *args, **kwargs)
+
+        headers = get_validator_headers(make_etag(*version), last_modified=version[0])
+        if is_not_modified(request, headers['ETag'], version[0]):
+            return not_modified_response(headers)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+
+class ConditionalListMixin:
+    """
+    Answer list GETs with 304 Not Modified when the page's rows and pagination state are
+    unchanged, checked after the page query but before serialization.
+    """
+
+    def get_row_version(self, obj):
+        return obj.pk, obj.updated_at
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        fingerprint = self.paginator.get_fingerprint() if page is not None else None
+        etag = make_etag(fingerprint, [self.get_row_version(obj) for obj in rows])
+        headers = get_validator_headers(etag)
+        if is_not_modified(request, etag):
+            return not_modified_response(headers)
+
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data, status=status.HTTP_200_OK)
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -0,0 +1,80 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from authentication.authentication import invalidate_user
+from authentication.models import User
+from cooks_corner.models import Recipe, LikedRecipe, SavedRecipe, Follow
+
+
+# counter column -> (source model, foreign key on the source model pointing at the counted row)
+RECIPE_COUNTERS = {
+    'likes_count': (LikedRecipe, 'recipe'),
+    'saves_count': (SavedRecipe, 'recipe'),
+}
+PROFILE_COUNTERS = {
+    'followers_count': (Follow, 'followed'),
+    'following_count': (Follow, 'follower'),
+    'recipes_count': (Recipe, 'author'),
+}
+COUNTERS = {
+    Recipe: RECIPE_COUNTERS,
+    User: PROFILE_COUNTERS,
+}
+
+
+# Counter writes bypass save(), so they bump the row version (updated_at) themselves
+# and drop the authenticated user cache of the profiles they change.
+
+def touched(model, pks):
+    if model is User:
+        for pk in pks:
+            invalidate_user(pk)
+
+
+def increment_counter(model, pk, field):
+    model.objects.filter(pk=pk).update(**{field: F(field) + 1, 'updated_at': Now()})
+    touched(model, [pk])
+
+
+def decrement_counter(model, pk, field):
+    # The guard keeps the column from going negative if it has already drifted.
+    model.objects.filter(pk=pk, **{f'{field}__gt': 0}).update(**{field: F(field) - 1, 'updated_at': Now()})
+    touched(model, [pk])
+
+
+def counter_subquery(model, field):
+    source, relation = COUNTERS[model][field]
+    counts = (
+        source.objects.filter(**{relation: OuterRef('pk')})
+        .order_by()
+        .values(relation)
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def sync_counters(model, queryset=None, fields=None):
+    """
+    Recompute the counter columns of the rows that drifted from their source tables.
+    Returns the number of rows that were out of sync.
+    """
+    fields = fields or list(COUNTERS[model])
+    drifted_ids = list(find_drifted(model, queryset, fields).values_list('pk', flat=True))
+    # Only drifted rows are rewritten, so the row versions of correct rows stay untouched.
+    for start in range(0, len(drifted_ids), 1000):
+        model.objects.filter(pk__in=drifted_ids[start:start + 1000]).update(
+            **{field: counter_subquery(model, field) for field in fields},
+            updated_at=Now(),
+        )
+    touched(model, drifted_ids)
+    return len(drifted_ids)
+
+
+def find_drifted(model, queryset=None, fields=None):
+    queryset = model.objects.all() if queryset is None else queryset
+    fields = fields or list(COUNTERS[model])
+    annotations = {f'actual_{field}': counter_subquery(model, field) for field in fields}
+    condition = Q()
+    for field in fields:
+        condition |= ~Q(**{field: F(f'actual_{field}')})
+    return queryset.annotate(**annotations).filter(condition)
@@ -0,0 +1,144 @@
+import csv
+import datetime
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from cooks_corner.models import Recipe, RecipeImage, RecipeIngredient, LikedRecipe, SavedRecipe, Follow
+
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+# Rows joined into one chunk of the stream, so a response is not written a line at a time.
+LINES_PER_CHUNK = 100
+
+
+def recipe_row(recipe):
+    return {
+        'id': recipe.pk,
+        'title': recipe.title,
+        'author': recipe.author_id,
+        'category': recipe.category_id,
+        'description': recipe.description,
+        'cook_time': recipe.cook_time,
+        'difficulty': recipe.difficulty,
+        'likes_count': recipe.likes_count,
+        'saves_count': recipe.saves_count,
+        'updated_at': recipe.updated_at,
+        'ingredients': [
+            {'id': item.ingredient_id, 'name': item.ingredient.name, 'quantity': item.quantity}
+            for item in recipe.recipe_ingredients.all()
+        ],
+        'images': [image.image.url for image in recipe.images.all()],
+    }
+
+
+def get_recipes():
+    return Recipe.objects.prefetch_related(
+        Prefetch('recipe_ingredients', queryset=RecipeIngredient.objects.select_related('ingredient').order_by('pk')),
+        Prefetch('images', queryset=RecipeImage.objects.filter(status=RecipeImage.READY).exclude(image='').order_by('pk')),
+    )
+
+
+class Dataset:
+    """
+    One exportable table: its rows, the columns of a row and the timestamp `since=` compares against.
+    """
+
+    def __init__(self, get_queryset, watermark, columns, to_row=None):
+        self.get_queryset = get_queryset
+        self.watermark = watermark
+        self.columns = columns
+        self.to_row = to_row or (lambda obj: {column: getattr(obj, column) for column in columns})
+
+    def rows(self, since=None, until=None):
+        queryset = self.get_queryset()
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.watermark}__gt': since})
+        if until is not None:
+            queryset = queryset.filter(**{f'{self.watermark}__lte': until})
+        # A server-side cursor on PostgreSQL; prefetches run once per chunk of EXPORT_CHUNK_SIZE rows.
+        for obj in queryset.order_by('pk').iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            yield self.to_row(obj)
+
+
+DATASETS = {
+    'recipes': Dataset(
+        get_recipes, 'updated_at',
+        ['id', 'title', 'author', 'category', 'description', 'cook_time', 'difficulty', 'likes_count',
+         'saves_count', 'updated_at', 'ingredients', 'images'],
+        recipe_row,
+    ),
+    'likes': Dataset(LikedRecipe.objects.all, 'liked_on', ['id', 'user_id', 'recipe_id', 'liked_on']),
+    'saves': Dataset(SavedRecipe.objects.all, 'saved_on', ['id', 'user_id', 'recipe_id', 'saved_on']),
+    'follows': Dataset(Follow.objects.all, 'followed_on', ['id', 'follower_id', 'followed_id', 'followed_on']),
+}
+
+
+def encode_ndjson(dataset, rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    # File-like object handing back what csv.writer writes, instead of keeping it.
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    # Nested values (ingredients, images) are JSON in their cell; datetimes are ISO 8601 as in NDJSON.
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+    if isinstance(value, datetime.datetime):
+        return DjangoJSONEncoder().default(value)
+    return value
+
+
+def encode_csv(dataset, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(dataset.columns)
+    for row in rows:
+        yield writer.writerow([csv_value(row[column]) for column in dataset.columns])
+
+
+ENCODERS = {
+    NDJSON: encode_ndjson,
+    CSV: encode_csv,
+}
+
+
+def parse_since(value):
+    """
+    The `since` watermark: an ISO 8601 datetime, in the current time zone when it has no offset.
+    Raises ValueError when it is not one.
+    """
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError(f'Invalid datetime: {value}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def stream(name, output, since=None, until=None):
+    """
+    Lines of the `name` dataset in the `output` format, joined into chunks of LINES_PER_CHUNK.
+    Rows changed after `since` (exclusive) and up to `until` (inclusive) are exported; pass
+    this export's `until` as the next one's `since` for incremental exports.
+    """
+    dataset = DATASETS[name]
+    lines = []
+    for line in ENCODERS[output](dataset, dataset.rows(since, until)):
+        lines.append(line)
+        if len(lines) >= LINES_PER_CHUNK:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
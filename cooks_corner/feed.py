@@ -0,0 +1,83 @@
+from django.conf import settings
+from authentication.models import User
+from cooks_corner.models import FeedEntry, Follow, Recipe
+
+
+def get_fanout_limit():
+    return settings.FEED_FANOUT_LIMIT
+
+
+def fan_out_recipe(recipe_id, author_id):
+    """
+    Push a recipe into the timelines of the author's followers and mark it fanned out.
+    Returns whether it was pushed.
+
+    Recipes of authors above the fan-out limit are left to be pulled at read time, for good
+    unless the author drops back under the limit before a later `fan_out_pending` run.
+    """
+    followers_count = User.objects.filter(pk=author_id).values_list('followers_count', flat=True).first()
+    if followers_count is None or followers_count > get_fanout_limit():
+        return False
+    follower_ids = Follow.objects.filter(followed_id=author_id).values_list('follower_id', flat=True)
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=1000):
+        batch.append(FeedEntry(user_id=follower_id, recipe_id=recipe_id, author_id=author_id))
+        if len(batch) >= 1000:
+            FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+    Recipe.objects.filter(pk=recipe_id).update(fanned_out=True)
+    return True
+
+
+def fan_out_pending():
+    """
+    Fan out the recipes not pushed yet whose authors are under the fan-out limit.
+    Run out of the request path by `manage.py fan_out_recipes`; returns the number of recipes pushed.
+    """
+    pending = (
+        Recipe.objects.filter(fanned_out=False, author__followers_count__lte=get_fanout_limit())
+        .order_by('id')
+        .values_list('id', 'author_id')
+    )
+    return sum(fan_out_recipe(recipe_id, author_id) for recipe_id, author_id in list(pending))
+
+
+def backfill_follow(follower_id, followed_id):
+    # Seed the timeline with the author's latest recipes so a new follow is visible at once.
+    recipe_ids = (
+        Recipe.objects.filter(author_id=followed_id)
+        .order_by('-id')
+        .values_list('id', flat=True)[:settings.FEED_BACKFILL_SIZE]
+    )
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=follower_id, recipe_id=recipe_id, author_id=followed_id) for recipe_id in recipe_ids],
+        ignore_conflicts=True,
+    )
+
+
+def remove_follow(follower_id, followed_id):
+    FeedEntry.objects.filter(user_id=follower_id, author_id=followed_id).delete()
+
+
+def get_candidate_ids(user, position=None, reverse=False, limit=10):
+    """
+    Return up to `limit` recipe ids per source on the requested side of the cursor:
+    the materialized timeline plus the followed authors' recipes that were not fanned out.
+    """
+    lookup = 'gt' if reverse else 'lt'
+    entries = FeedEntry.objects.filter(user=user)
+    if position is not None:
+        entries = entries.filter(**{f'recipe_id__{lookup}': position})
+    candidate_ids = list(
+        entries.order_by('recipe_id' if reverse else '-recipe_id').values_list('recipe_id', flat=True)[:limit]
+    )
+
+    pulled = Recipe.objects.filter(
+        fanned_out=False, author_id__in=Follow.objects.filter(follower=user).values('followed_id')
+    )
+    if position is not None:
+        pulled = pulled.filter(**{f'id__{lookup}': position})
+    candidate_ids += list(pulled.order_by('id' if reverse else '-id').values_list('id', flat=True)[:limit])
+    return candidate_ids
@@ -1,5 +1,6 @@
 import django_filters
-from cooks_corner.models import Recipe
+from cooks_corner import search
+from cooks_corner.models import Recipe, LikedRecipe, SavedRecipe, Follow
 from authentication.models import User
 
 class RecipeFilter(django_filters.FilterSet):
@@ -9,10 +10,11 @@ class RecipeFilter(django_filters.FilterSet):
     category_id = django_filters.NumberFilter(field_name='category__id')
     category_name = django_filters.CharFilter(field_name='category__name', lookup_expr='icontains')
     saved_by_user = django_filters.BooleanFilter(method='filter_saved_by_user')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ['author_id', 'author_username', 'category_id', 'category_name', 'saved_by_user']
+        fields = ['author_id', 'author_username', 'category_id', 'category_name', 'saved_by_user', 'search']
 
     def filter_saved_by_user(self, queryset, name, value):
         user = self.request.user
@@ -20,10 +22,41 @@ class RecipeFilter(django_filters.FilterSet):
             return queryset.filter(saved_by__user=user)
         return queryset
 
+    def filter_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search.filter_recipes(queryset, value)
+
 
 class UserFilter(django_filters.FilterSet):
     username = django_filters.CharFilter(field_name='username', lookup_expr='icontains')
 
     class Meta:
         model = User
-        fields = ['username']
\ No newline at end of file
+        fields = ['username']
+
+class LikedRecipeFilter(django_filters.FilterSet):
+    user_id = django_filters.NumberFilter(field_name='user_id')
+    recipe_id = django_filters.NumberFilter(field_name='recipe_id')
+
+    class Meta:
+        model = LikedRecipe
+        fields = ['user_id', 'recipe_id']
+
+
+class SavedRecipeFilter(django_filters.FilterSet):
+    user_id = django_filters.NumberFilter(field_name='user_id')
+    recipe_id = django_filters.NumberFilter(field_name='recipe_id')
+
+    class Meta:
+        model = SavedRecipe
+        fields = ['user_id', 'recipe_id']
+
+
+class FollowFilter(django_filters.FilterSet):
+    follower_id = django_filters.NumberFilter(field_name='follower_id')
+    followed_id = django_filters.NumberFilter(field_name='followed_id')
+
+    class Meta:
+        model = Follow
+        fields = ['follower_id', 'followed_id']
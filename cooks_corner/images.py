@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_image_storage():
+    """
+    Final storage of uploaded images, configurable through IMAGE_STORAGE
+    (Cloudinary in production, FileSystemStorage for tests and local runs).
+    """
+    return import_string(settings.IMAGE_STORAGE)()
+
+
+def get_staging_storage():
+    return FileSystemStorage(location=settings.IMAGE_STAGING_ROOT)
+
+
+def stage_upload(upload, prefix):
+    # Local disk write only, so the request does not wait for the final storage.
+    return get_staging_storage().save(os.path.join(prefix, os.path.basename(upload.name)), upload)
+
+
+def load_image(file):
+    """
+    Decode an image, apply its EXIF orientation and bound its size.
+    Raises ValueError when the file is not a usable image.
+    """
+    try:
+        with Image.open(file) as image:
+            image.load()
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((settings.IMAGE_MAX_SIZE, settings.IMAGE_MAX_SIZE))
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Invalid image: {e}')
+    return image
+
+
+def encode_image(image, format, **options):
+    # Encoding without passing `exif` drops the metadata (location, device, ...).
+    output = BytesIO()
+    if format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(output, format=format, **options)
+    return ContentFile(output.getvalue())
+
+
+def process_image(staged_name):
+    with get_staging_storage().open(staged_name) as staged:
+        image = load_image(staged)
+    stem = os.path.splitext(os.path.basename(staged_name))[0]
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if has_alpha:
+        return image, f'{stem}.png', encode_image(image, 'PNG', optimize=True)
+    return image, f'{stem}.jpg', encode_image(image, 'JPEG', quality=85, optimize=True)
+
+
+def save_variants(storage, image, name):
+    """
+    Store downscaled copies of an image next to the original, one per width in IMAGE_VARIANT_WIDTHS
+    narrower than the image, as WebP with a JPEG fallback. Returns {width: {format: name}}.
+    """
+    stem = os.path.splitext(name)[0]
+    variants = {}
+    for width in sorted(settings.IMAGE_VARIANT_WIDTHS):
+        if width >= image.width:
+            break
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        variants[str(width)] = {
+            'webp': storage.save(f'{stem}_{width}w.webp', encode_image(resized, 'WEBP', quality=80)),
+            'jpeg': storage.save(f'{stem}_{width}w.jpg', encode_image(resized, 'JPEG', quality=80, optimize=True)),
+        }
+    return variants
+
+
+def ingest_recipe_image(image_id):
+    from cooks_corner.models import RecipeImage
+
+    recipe_image = RecipeImage.objects.filter(pk=image_id, status=RecipeImage.PENDING).first()
+    if recipe_image is None:
+        return
+    staged_name = recipe_image.staged_file
+    try:
+        image, name, content = process_image(staged_name)
+    except ValueError:
+        logger.warning('Recipe image %s rejected', image_id, exc_info=True)
+        recipe_image.status = RecipeImage.FAILED
+    else:
+        recipe_image.image.save(name, content, save=False)
+        recipe_image.variants = save_variants(recipe_image.image.storage, image, recipe_image.image.name)
+        recipe_image.status = RecipeImage.READY
+    recipe_image.staged_file = ''
+    recipe_image.save()
+    get_staging_storage().delete(staged_name)
+
+
+def ingest_profile_photo(user_id, staged_name):
+    from authentication.models import User
+
+    # Gone or replaced by a newer upload when the user no longer points at this file.
+    user = User.objects.filter(pk=user_id, staged_photo=staged_name).first()
+    try:
+        if user is None:
+            return
+        try:
+            _, name, content = process_image(staged_name)
+        except ValueError:
+            logger.warning('Profile photo of user %s rejected', user_id, exc_info=True)
+            update_fields = ['staged_photo']
+        else:
+            user.photo.save(name, content, save=False)
+            update_fields = ['photo', 'staged_photo', 'updated_at']
+        user.staged_photo = ''
+        user.save(update_fields=update_fields)
+    finally:
+        get_staging_storage().delete(staged_name)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        # Created lazily, so every gunicorn worker gets its own pool after the fork.
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix='image-ingest')
+        return _executor
+
+
+def run_in_worker(task, *args):
+    close_old_connections()
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Image ingestion task %s%r failed', task.__name__, args)
+    finally:
+        close_old_connections()
+
+
+def enqueue(task, *args):
+    """
+    Run an ingestion task in the worker pool once the current transaction commits.
+    With IMAGE_WORKERS = 0 tasks run inline, which is what tests and management commands want.
+
+    The pool lives in the web process that staged the upload, since the staging directory is its
+    local disk: image work shares that process's CPU with its requests, and a restart loses the
+    queue. The rows stay pending until `manage.py process_pending_images` picks them up.
+    """
+    if settings.IMAGE_WORKERS <= 0:
+        transaction.on_commit(lambda: task(*args))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(run_in_worker, task, *args))
@@ -0,0 +1,180 @@
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+from cooks_corner.models import Recipe, RecipeIngredient, clean_ingredient_name
+
+
+RANKED_RESULTS_LIMIT = 500
+# Recipes changed this long before the last refresh are re-read too, covering clock skew
+# between app servers and transactions that committed late.
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def normalize_name(name):
+    return clean_ingredient_name(name).lower()
+
+
+class IngredientIndex:
+    """
+    Per-process inverted index: ingredient id -> sorted array of the ids of the recipes using it.
+
+    Writes in this process are applied right after commit (see cooks_corner.signals); writes
+    in other processes are picked up through Recipe.updated_at every INGREDIENT_INDEX_REFRESH_SECONDS.
+    Deleted recipes are dropped when `search` results fail to load.
+
+    `lock` is only held for in-memory work, never across a query: builds and refreshes read the
+    rows first, then swap or apply them, so searches keep using the current state meanwhile.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # One build or refresh at a time.
+        self.refresh_lock = threading.Lock()
+        self.built = False
+        self.postings = {}
+        self.recipes = {}
+        self.names = {}
+        self.ingredient_names = {}
+        self.sizes = np.zeros(0, dtype=np.int32)
+        self.synced_at = None
+        self.checked_at = 0.0
+
+    def build(self):
+        # Read first, so changes made while the rows are loaded are re-read by the next refresh.
+        synced_at = Recipe.objects.aggregate(synced_at=Max('updated_at'))['synced_at']
+        rows = RecipeIngredient.objects.values_list('recipe_id', 'ingredient_id', 'ingredient__name').order_by()
+        ingredients, ingredient_names, names = {}, {}, {}
+        for recipe_id, ingredient_id, name in rows.iterator(chunk_size=10000):
+            ingredients.setdefault(recipe_id, set()).add(ingredient_id)
+            ingredient_names[ingredient_id] = normalize_name(name)
+        for ingredient_id, name in ingredient_names.items():
+            names.setdefault(name, set()).add(ingredient_id)
+        recipes, postings = {}, {}
+        for recipe_id, ingredient_ids in ingredients.items():
+            recipes[recipe_id] = frozenset(ingredient_ids)
+            for ingredient_id in ingredient_ids:
+                postings.setdefault(ingredient_id, []).append(recipe_id)
+        postings = {
+            ingredient_id: np.array(sorted(recipe_ids), dtype=np.int64)
+            for ingredient_id, recipe_ids in postings.items()
+        }
+        sizes = np.zeros(max(recipes) + 1 if recipes else 0, dtype=np.int32)
+        for recipe_id, ingredient_ids in recipes.items():
+            sizes[recipe_id] = len(ingredient_ids)
+
+        with self.lock:
+            self.postings, self.recipes, self.sizes = postings, recipes, sizes
+            self.names, self.ingredient_names = names, ingredient_names
+            self.synced_at = synced_at
+            self.built = True
+            self.checked_at = time.monotonic()
+
+    def refresh(self):
+        changed = Recipe.objects.all()
+        if self.synced_at is not None:
+            changed = changed.filter(updated_at__gte=self.synced_at - REFRESH_OVERLAP)
+        changed = list(changed.values_list('id', 'updated_at'))
+        if changed:
+            self.index_recipes([recipe_id for recipe_id, _ in changed])
+        with self.lock:
+            if changed:
+                latest = max(updated_at for _, updated_at in changed)
+                self.synced_at = latest if self.synced_at is None else max(self.synced_at, latest)
+            self.checked_at = time.monotonic()
+
+    def index_recipes(self, recipe_ids):
+        rows = list(
+            RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).values_list(
+                'recipe_id', 'ingredient_id', 'ingredient__name'
+            )
+        )
+        ingredients = {recipe_id: set() for recipe_id in recipe_ids}
+        with self.lock:
+            for recipe_id, ingredient_id, name in rows:
+                ingredients[recipe_id].add(ingredient_id)
+                self.set_name(ingredient_id, normalize_name(name))
+            for recipe_id, ingredient_ids in ingredients.items():
+                self.set_recipe(recipe_id, frozenset(ingredient_ids))
+
+    def set_name(self, ingredient_id, name):
+        # A renamed ingredient stops matching its previous name.
+        previous = self.ingredient_names.get(ingredient_id)
+        if previous == name:
+            return
+        if previous is not None:
+            self.names[previous].discard(ingredient_id)
+        self.names.setdefault(name, set()).add(ingredient_id)
+        self.ingredient_names[ingredient_id] = name
+
+    def remove_recipe(self, recipe_id):
+        with self.lock:
+            self.set_recipe(recipe_id, frozenset())
+
+    def set_recipe(self, recipe_id, ingredient_ids):
+        previous = self.recipes.pop(recipe_id, frozenset())
+        for ingredient_id in previous - ingredient_ids:
+            posting = self.postings[ingredient_id]
+            self.postings[ingredient_id] = np.delete(posting, np.searchsorted(posting, recipe_id))
+        for ingredient_id in ingredient_ids - previous:
+            posting = self.postings.get(ingredient_id, np.zeros(0, dtype=np.int64))
+            self.postings[ingredient_id] = np.insert(posting, np.searchsorted(posting, recipe_id), recipe_id)
+        if ingredient_ids:
+            self.recipes[recipe_id] = ingredient_ids
+            if recipe_id >= len(self.sizes):
+                # Ingredient counts by recipe id, grown geometrically as ids increase.
+                sizes = np.zeros(max(recipe_id + 1, len(self.sizes) * 2), dtype=np.int32)
+                sizes[:len(self.sizes)] = self.sizes
+                self.sizes = sizes
+        if recipe_id < len(self.sizes):
+            self.sizes[recipe_id] = len(ingredient_ids)
+
+    def search(self, names, limit=RANKED_RESULTS_LIMIT):
+        """
+        Rank the recipes using any of the named ingredients by matched ingredients (most first),
+        then missing ones (fewest first). Returns (recipe id, matched, missing) tuples.
+        """
+        with self.lock:
+            requested = []
+            for name in {normalize_name(name) for name in names}:
+                postings = [self.postings[i] for i in self.names.get(name, ()) if i in self.postings]
+                if postings:
+                    # Several catalog entries can share a name once case is ignored; count them once.
+                    requested.append(np.unique(np.concatenate(postings)) if len(postings) > 1 else postings[0])
+            if not requested:
+                return []
+            candidates, matched = np.unique(np.concatenate(requested), return_counts=True)
+            missing = self.sizes[candidates] - matched
+        order = np.lexsort((candidates, missing, -matched))[:limit]
+        return list(zip(candidates[order].tolist(), matched[order].tolist(), missing[order].tolist()))
+
+
+index = IngredientIndex()
+
+
+def get_index():
+    if not index.built:
+        with index.refresh_lock:
+            if not index.built:
+                index.build()
+    elif time.monotonic() - index.checked_at > settings.INGREDIENT_INDEX_REFRESH_SECONDS:
+        # Other requests keep searching the current state while this one refreshes it.
+        if index.refresh_lock.acquire(blocking=False):
+            try:
+                index.refresh()
+            finally:
+                index.refresh_lock.release()
+    return index
+
+
+def index_recipe(recipe_id):
+    # Only maintained once a search has built it in this process.
+    if index.built:
+        index.index_recipes([recipe_id])
+
+
+def remove_recipe(recipe_id):
+    if index.built:
+        index.remove_recipe(recipe_id)
@@ -0,0 +1,75 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a running server with concurrent GET requests and report throughput and latency, e.g. to compare '
+        'the WSGI deployment (port 8020) with the ASGI one (docker compose --profile asgi, port 8021): '
+        'benchmark_http http://localhost:8020/cookscorner/recipes/ --token <access token> --concurrency 200, '
+        'then the same against http://localhost:8021/cookscorner/async/recipes/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--token', help='JWT access token sent as a Bearer Authorization header.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Connections kept in flight at once.')
+        parser.add_argument('--requests', type=int, default=1000, help='Total number of requests.')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Only http:// URLs are supported.')
+        path = url.path + (f'?{url.query}' if url.query else '')
+        headers = [f'GET {path} HTTP/1.1', f'Host: {url.netloc}', 'Connection: close']
+        if options['token']:
+            headers.append(f'Authorization: Bearer {options["token"]}')
+        request = ('\r\n'.join(headers) + '\r\n\r\n').encode('ascii')
+
+        started = time.perf_counter()
+        latencies, statuses = asyncio.run(self.run(url.hostname, url.port or 80, request, options))
+        elapsed = time.perf_counter() - started
+
+        ok = sum(1 for status in statuses if status and status < 400)
+        self.stdout.write(f'{len(statuses)} requests in {elapsed:.2f}s, {len(statuses) / elapsed:.1f} req/s, '
+                          f'{ok} ok, {len(statuses) - ok} failed')
+        if latencies:
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f'latency ms: p50 {quantiles[49] * 1000:.1f}, p95 {quantiles[94] * 1000:.1f}, '
+                f'p99 {quantiles[98] * 1000:.1f}, max {max(latencies) * 1000:.1f}'
+            )
+
+    async def run(self, host, port, request, options):
+        latencies, statuses = [], []
+        remaining = iter(range(options['requests']))
+
+        async def client():
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(self.fetch(host, port, request), options['timeout'])
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                    status = None
+                else:
+                    latencies.append(time.perf_counter() - started)
+                statuses.append(status)
+
+        await asyncio.gather(*(client() for _ in range(options['concurrency'])))
+        return latencies, statuses
+
+    async def fetch(self, host, port, request):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            # Connection: close, so the response ends with the connection.
+            await reader.read()
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
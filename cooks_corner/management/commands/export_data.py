@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from cooks_corner import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream recipes, likes, saves or follows as NDJSON or CSV, like /cookscorner/export/<dataset>/. '
+        'Prints the watermark to pass as --since to the next incremental export.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(export.DATASETS))
+        parser.add_argument('--output', choices=list(export.ENCODERS), default=export.NDJSON)
+        parser.add_argument('--since', help='Only export rows changed after this ISO 8601 datetime.')
+        parser.add_argument('--file', help='Write to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = export.parse_since(options['since'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        until = timezone.now()
+        file = open(options['file'], 'w', encoding='utf-8', newline='') if options['file'] else None
+        try:
+            for chunk in export.stream(options['dataset'], options['output'], since, until):
+                if file is None:
+                    self.stdout.write(chunk, ending='')
+                else:
+                    file.write(chunk)
+        finally:
+            if file is not None:
+                file.close()
+        self.stderr.write(f'Exported {options["dataset"]} up to {until.isoformat()} (--since for the next run).')
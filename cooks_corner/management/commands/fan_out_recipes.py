@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from cooks_corner import feed
+
+
+class Command(BaseCommand):
+    help = (
+        "Push the recipes not fanned out yet into their authors' followers' timelines "
+        '(schedule it, e.g. every few seconds; feeds pull the recipes until then).'
+    )
+
+    def handle(self, *args, **options):
+        count = feed.fan_out_pending()
+        self.stdout.write(self.style.SUCCESS(f'Fanned out {count} recipe(s).'))
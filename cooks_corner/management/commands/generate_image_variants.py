@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from cooks_corner import images
+from cooks_corner.models import RecipeImage
+
+
+class Command(BaseCommand):
+    help = 'Generate the responsive width variants of recipe images processed before variants existed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate variants of every ready image.')
+
+    def handle(self, *args, **options):
+        queryset = RecipeImage.objects.filter(status=RecipeImage.READY).exclude(image='')
+        if not options['all']:
+            queryset = queryset.filter(variants={})
+
+        count = failed = 0
+        for recipe_image in queryset.iterator(chunk_size=100):
+            try:
+                with recipe_image.image.open('rb') as file:
+                    image = images.load_image(file)
+            except ValueError as e:
+                failed += 1
+                self.stderr.write(f'Image {recipe_image.pk}: {e}')
+                continue
+            recipe_image.variants = images.save_variants(recipe_image.image.storage, image, recipe_image.image.name)
+            recipe_image.save(update_fields=['variants'])
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {count} image(s), {failed} failed.'))
@@ -0,0 +1,21 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from config.schema import CODECS, get_artifact_path, get_code_version, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Write the OpenAPI schema of the current code version to SCHEMA_ROOT, where the schema views serve it from.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clean', action='store_true', help='Delete the artifacts of other code versions.')
+
+    def handle(self, *args, **options):
+        version = get_code_version()
+        write_schema(version)
+        if options['clean']:
+            current = {os.path.basename(get_artifact_path(version, extension)) for extension in CODECS}
+            for name in os.listdir(settings.SCHEMA_ROOT):
+                if name.startswith('openapi-') and name not in current:
+                    os.remove(os.path.join(settings.SCHEMA_ROOT, name))
+        self.stdout.write(self.style.SUCCESS(f'Schema {version} written to {settings.SCHEMA_ROOT}.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from authentication.models import User
+from cooks_corner import images
+from cooks_corner.models import RecipeImage
+
+
+class Command(BaseCommand):
+    help = 'Process recipe images and profile photos still pending, e.g. after a worker restart lost its queue.'
+
+    def handle(self, *args, **options):
+        image_ids = list(
+            RecipeImage.objects.filter(status=RecipeImage.PENDING).exclude(staged_file='').values_list('id', flat=True)
+        )
+        for image_id in image_ids:
+            images.ingest_recipe_image(image_id)
+        ready = RecipeImage.objects.filter(id__in=image_ids, status=RecipeImage.READY).count()
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(image_ids)} pending image(s), {ready} ready.'))
+
+        photos = list(User.objects.exclude(staged_photo='').values_list('id', 'staged_photo'))
+        for user_id, staged_name in photos:
+            images.ingest_profile_photo(user_id, staged_name)
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(photos)} pending profile photo(s).'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from cooks_corner import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the recipe full-text search index (tsvector column on PostgreSQL, FTS5 table on SQLite).'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt for {count} recipe(s).'))
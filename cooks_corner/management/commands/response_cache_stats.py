@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from cooks_corner.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Show hit/miss counters of the recipe response cache. Counters live in the configured cache, '
+        'so they are only visible from here with a shared (e.g. file-based) backend.'
+    )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f'hit ratio: {ratio:.2%}')
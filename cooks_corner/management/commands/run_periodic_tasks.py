@@ -0,0 +1,32 @@
+import logging
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run the management commands of PERIODIC_TASKS at their intervals, in one long-lived worker process.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run every task once and exit, e.g. from cron.')
+
+    def handle(self, *args, **options):
+        next_runs = [0.0] * len(settings.PERIODIC_TASKS)
+        while True:
+            for position, (interval, command, arguments) in enumerate(settings.PERIODIC_TASKS):
+                if next_runs[position] > time.monotonic():
+                    continue
+                close_old_connections()
+                try:
+                    call_command(command, *arguments, stdout=self.stdout)
+                except Exception:
+                    logger.exception('Periodic task %s %s failed', command, ' '.join(arguments))
+                next_runs[position] = time.monotonic() + interval
+            if options['once']:
+                return
+            time.sleep(max(0.0, min(next_runs) - time.monotonic()))
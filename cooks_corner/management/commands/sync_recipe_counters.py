@@ -0,0 +1,8 @@
+from cooks_corner.management.counters_command import CounterSyncCommand
+from cooks_corner.models import Recipe
+
+
+class Command(CounterSyncCommand):
+    help = 'Rebuild Recipe.likes_count and Recipe.saves_count from the LikedRecipe and SavedRecipe tables.'
+    model = Recipe
+    label = 'recipe'
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from cooks_corner import similarity
+
+
+class Command(BaseCommand):
+    help = 'Update the similar recipes of the recipes touched by likes and saves since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Recompute the neighbours of every recipe, including events committed late (schedule it daily).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Recipes whose co-occurrences are multiplied at once.')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            count = similarity.rebuild_similarities(options['chunk_size'])
+        else:
+            count = similarity.update_similarities(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Similar recipes updated for {count} recipe(s).'))
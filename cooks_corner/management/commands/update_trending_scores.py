@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from cooks_corner import trending
+
+
+class Command(BaseCommand):
+    help = 'Add the likes and saves since the last run to the trending scores (schedule it, e.g. every few minutes).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Recompute every score, dropping removed likes and saves and adding those committed late (schedule it daily).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Events aggregated per transaction.')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            count = trending.rebuild_scores(options['chunk_size'])
+        else:
+            count = trending.update_scores(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Trending scores updated from {count} event(s).'))
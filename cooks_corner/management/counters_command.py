@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from cooks_corner.counters import COUNTERS, find_drifted, sync_counters
+
+
+class CounterSyncCommand(BaseCommand):
+    """
+    Base for the commands that repair denormalized counter columns after drift.
+    """
+    model = None
+    label = 'row'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report rows whose counters have drifted, without fixing them.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            self.report_drift()
+            return
+
+        with transaction.atomic():
+            drifted = sync_counters(self.model)
+        self.stdout.write(self.style.SUCCESS(f'Counters rebuilt, {drifted} {self.label}(s) were out of sync.'))
+
+    def report_drift(self):
+        fields = list(COUNTERS[self.model])
+        columns = [column for field in fields for column in (field, f'actual_{field}')]
+        total = 0
+        for row in find_drifted(self.model).values('pk', *columns).iterator():
+            total += 1
+            details = ', '.join(f'{field} {row[field]} (actual {row[f"actual_{field}"]})' for field in fields)
+            self.stdout.write(f'{self.label.capitalize()} {row["pk"]}: {details}')
+        if total:
+            self.stdout.write(self.style.WARNING(f'{total} {self.label}(s) have drifted counters.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'All {self.label} counters are in sync.'))
@@ -0,0 +1,113 @@
+import os
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+
+
+# With PROMETHEUS_MULTIPROC_DIR set (before the workers start), every gunicorn worker writes its
+# samples to files in that directory and the metrics endpoint aggregates all of them.
+REQUESTS = Counter(
+    'cookscorner_http_requests_total', 'HTTP requests by URL name.', ['view', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'cookscorner_http_request_duration_seconds', 'Request latency by URL name.', ['view'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'cookscorner_db_queries_per_request', 'SQL queries per request by URL name.', ['view'],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+QUERY_TIME = Counter(
+    'cookscorner_db_query_duration_seconds_total', 'Time spent in SQL queries by URL name.', ['view'],
+)
+
+# SQL stats of the request being handled; sync_to_async copies the context, so the queries
+# async views run in worker threads are counted too.
+current_stats = ContextVar('current_stats', default=None)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Same hook as connection.execute_wrapper(), installed for the lifetime of every connection
+    # instead of around one request: async views query through connections of other threads.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else 'unmatched'
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency and SQL queries per URL name and report them in a Server-Timing header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, started = QueryStats(), time.perf_counter()
+        token = current_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.record(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, started = QueryStats(), time.perf_counter()
+        token = current_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.record(request, response, stats, started)
+
+    def record(self, request, response, stats, started):
+        duration = time.perf_counter() - started
+        view = get_view_name(request)
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        LATENCY.labels(view).observe(duration)
+        QUERIES.labels(view).observe(stats.count)
+        QUERY_TIME.labels(view).inc(stats.duration)
+        response['Server-Timing'] = (
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={duration * 1000:.1f}'
+        )
+        return response
+
+
+def render_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
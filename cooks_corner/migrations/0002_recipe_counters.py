@@ -0,0 +1,44 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Recipe = apps.get_model('cooks_corner', 'Recipe')
+    LikedRecipe = apps.get_model('cooks_corner', 'LikedRecipe')
+    SavedRecipe = apps.get_model('cooks_corner', 'SavedRecipe')
+
+    def count_of(model):
+        counts = (
+            model.objects.filter(recipe=OuterRef('pk'))
+            .order_by()
+            .values('recipe')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return Coalesce(Subquery(counts), Value(0))
+
+    Recipe.objects.update(likes_count=count_of(LikedRecipe), saves_count=count_of(SavedRecipe))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='saves_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
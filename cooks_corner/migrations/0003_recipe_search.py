@@ -0,0 +1,69 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX cooks_corner_recipe_search_gin ON cooks_corner_recipe USING gin (search_vector)",
+    """
+    UPDATE cooks_corner_recipe r SET search_vector =
+        setweight(to_tsvector('simple', coalesce(r.title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(r.description, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((
+            SELECT string_agg(i.name, ' ')
+            FROM cooks_corner_recipe_ingredients ri
+            JOIN cooks_corner_ingredient i ON i.id = ri.ingredient_id
+            WHERE ri.recipe_id = r.id
+        ), '')), 'C')
+    """,
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS cooks_corner_recipe_search_gin",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cooks_corner_recipe_fts "
+    "USING fts5(title, description, ingredients, tokenize='unicode61 remove_diacritics 2')",
+    """
+    INSERT INTO cooks_corner_recipe_fts (rowid, title, description, ingredients)
+    SELECT r.id, r.title, r.description, coalesce((
+        SELECT group_concat(i.name, ' ')
+        FROM cooks_corner_recipe_ingredients ri
+        JOIN cooks_corner_ingredient i ON i.id = ri.ingredient_id
+        WHERE ri.recipe_id = r.id
+    ), '')
+    FROM cooks_corner_recipe r
+    """,
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS cooks_corner_recipe_fts",
+]
+
+
+def run_for_vendor(postgres_statements, sqlite_statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        statements = {'postgresql': postgres_statements, 'sqlite': sqlite_statements}.get(vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0002_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
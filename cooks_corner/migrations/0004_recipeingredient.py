@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0003_recipe_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('unit_name', models.CharField(max_length=10)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='cooks_corner.ingredient')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='cooks_corner.recipe')),
+            ],
+            options={
+                'ordering': ['id'],
+                'unique_together': {('recipe', 'ingredient')},
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+
+def clean_name(name):
+    # Same normalisation as RecipeSerializer.resolve_ingredients, which also compares the names lowercased.
+    return ' '.join(name.split())
+
+
+def normalize_ingredients(apps, schema_editor):
+    """
+    Collapse Ingredient rows sharing a name, ignoring case and whitespace, into one catalog row and move the
+    per-recipe quantity and unit onto RecipeIngredient.
+    """
+    Recipe = apps.get_model('cooks_corner', 'Recipe')
+    Ingredient = apps.get_model('cooks_corner', 'Ingredient')
+    RecipeIngredient = apps.get_model('cooks_corner', 'RecipeIngredient')
+    RecipeIngredients = Recipe.ingredients.through
+
+    canonical_ids = {}
+    details = {}
+    for ingredient in Ingredient.objects.order_by('id').iterator():
+        name = clean_name(ingredient.name)
+        # The first row's spelling becomes the catalog name.
+        canonical_ids.setdefault(name.lower(), (ingredient.id, name))
+        details[ingredient.id] = (name.lower(), ingredient.quantity, ingredient.unit_name)
+
+    rows = []
+    linked = set()
+    for link in RecipeIngredients.objects.order_by('id').values('recipe_id', 'ingredient_id').iterator():
+        key, quantity, unit_name = details[link['ingredient_id']]
+        ingredient_id, _ = canonical_ids[key]
+        # A recipe listing the same ingredient twice keeps its first quantity.
+        if (link['recipe_id'], ingredient_id) in linked:
+            continue
+        linked.add((link['recipe_id'], ingredient_id))
+        rows.append(RecipeIngredient(
+            recipe_id=link['recipe_id'],
+            ingredient_id=ingredient_id,
+            quantity=quantity,
+            unit_name=unit_name,
+        ))
+    RecipeIngredient.objects.bulk_create(rows, batch_size=1000)
+
+    Ingredient.objects.exclude(id__in=[ingredient_id for ingredient_id, _ in canonical_ids.values()]).delete()
+    for ingredient_id, name in canonical_ids.values():
+        Ingredient.objects.filter(id=ingredient_id).exclude(name=name).update(name=name)
+
+
+def denormalize_ingredients(apps, schema_editor):
+    """
+    Give every RecipeIngredient its own Ingredient row with the quantity and unit again.
+
+    Lossy: merged spellings and repeated ingredients of a recipe are not restored.
+    """
+    Recipe = apps.get_model('cooks_corner', 'Recipe')
+    Ingredient = apps.get_model('cooks_corner', 'Ingredient')
+    RecipeIngredient = apps.get_model('cooks_corner', 'RecipeIngredient')
+    RecipeIngredients = Recipe.ingredients.through
+
+    catalog_ids = list(Ingredient.objects.values_list('id', flat=True))
+    rows = list(RecipeIngredient.objects.select_related('ingredient').order_by('id'))
+    copies = Ingredient.objects.bulk_create([
+        Ingredient(name=row.ingredient.name, quantity=row.quantity, unit_name=row.unit_name)
+        for row in rows
+    ], batch_size=1000)
+    RecipeIngredients.objects.bulk_create([
+        RecipeIngredients(recipe_id=row.recipe_id, ingredient_id=copy.id)
+        for row, copy in zip(rows, copies)
+    ], batch_size=1000)
+    RecipeIngredient.objects.all().delete()
+    Ingredient.objects.filter(id__in=catalog_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0004_recipeingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_ingredients, denormalize_ingredients),
+    ]
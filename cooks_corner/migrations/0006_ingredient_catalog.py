@@ -0,0 +1,35 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0005_normalize_ingredients'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='recipe',
+            name='ingredients',
+        ),
+        migrations.RemoveField(
+            model_name='ingredient',
+            name='quantity',
+        ),
+        migrations.RemoveField(
+            model_name='ingredient',
+            name='unit_name',
+        ),
+        migrations.AlterField(
+            model_name='ingredient',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients',
+            field=models.ManyToManyField(related_name='recipes', through='cooks_corner.RecipeIngredient', to='cooks_corner.ingredient'),
+        ),
+    ]
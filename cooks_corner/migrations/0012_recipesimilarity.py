@@ -0,0 +1,56 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+
+def prefix_trending_sources(apps, schema_editor):
+    EventCheckpoint = apps.get_model('cooks_corner', 'EventCheckpoint')
+    EventCheckpoint.objects.exclude(source__contains=':').update(source=Concat(Value('trending:'), 'source'))
+
+
+def unprefix_trending_sources(apps, schema_editor):
+    EventCheckpoint = apps.get_model('cooks_corner', 'EventCheckpoint')
+    EventCheckpoint.objects.exclude(source__startswith='trending:').delete()
+    for checkpoint in EventCheckpoint.objects.all():
+        checkpoint.source = checkpoint.source.removeprefix('trending:')
+        checkpoint.save(update_fields=['source'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0011_trending'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='TrendingCheckpoint',
+            new_name='EventCheckpoint',
+        ),
+        migrations.AlterField(
+            model_name='eventcheckpoint',
+            name='source',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.RunPython(prefix_trending_sources, unprefix_trending_sources),
+        migrations.CreateModel(
+            name='RecipeSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='cooks_corner.recipe')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='cooks_corner.recipe')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recipesimilarity',
+            index=models.Index(fields=['recipe', '-score'], name='cooks_corne_recipe__d41365_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recipesimilarity',
+            unique_together={('recipe', 'similar')},
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0012_recipesimilarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['follower', '-followed_on', '-id'], name='cooks_corne_followe_51391a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['followed', '-followed_on', '-id'], name='cooks_corne_followe_f0be36_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='likedrecipe',
+            index=models.Index(fields=['user', '-liked_on', '-id'], name='cooks_corne_user_id_345bab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='likedrecipe',
+            index=models.Index(fields=['recipe', '-liked_on', '-id'], name='cooks_corne_recipe__59493f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedrecipe',
+            index=models.Index(fields=['user', '-saved_on', '-id'], name='cooks_corne_user_id_0fb160_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedrecipe',
+            index=models.Index(fields=['recipe', '-saved_on', '-id'], name='cooks_corne_recipe__e43ace_idx'),
+        ),
+    ]
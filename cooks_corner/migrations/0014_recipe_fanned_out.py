@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:20
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Q
+
+
+def mark_fanned_out(apps, schema_editor):
+    """
+    Recipes that reached a timeline, or whose author had no follower to push them to, are delivered;
+    the others (authors above the fan-out limit) keep being pulled.
+    """
+    Recipe = apps.get_model('cooks_corner', 'Recipe')
+    FeedEntry = apps.get_model('cooks_corner', 'FeedEntry')
+    Follow = apps.get_model('cooks_corner', 'Follow')
+    Recipe.objects.filter(
+        Q(Exists(FeedEntry.objects.filter(recipe_id=OuterRef('pk'))))
+        | ~Q(Exists(Follow.objects.filter(followed_id=OuterRef('author_id'))))
+    ).update(fanned_out=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0013_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='fanned_out',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_fanned_out, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('fanned_out', False)), fields=['author', '-id'], name='recipe_pulled_idx'),
+        ),
+    ]
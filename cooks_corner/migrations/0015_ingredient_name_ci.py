@@ -0,0 +1,53 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:49
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def merge_ingredient_spellings(apps, schema_editor):
+    """
+    Merge catalog rows whose names differ only in case or whitespace, created before the
+    catalog was matched that way, into the oldest one.
+    """
+    Ingredient = apps.get_model('cooks_corner', 'Ingredient')
+    RecipeIngredient = apps.get_model('cooks_corner', 'RecipeIngredient')
+
+    canonical = {}
+    merged = {}
+    for ingredient in Ingredient.objects.order_by('id').iterator():
+        name = ' '.join(ingredient.name.split())
+        ingredient_id, _ = canonical.setdefault(name.lower(), (ingredient.id, name))
+        if ingredient_id != ingredient.id:
+            merged[ingredient.id] = ingredient_id
+
+    if merged:
+        linked = set(
+            RecipeIngredient.objects.exclude(ingredient_id__in=merged).values_list('recipe_id', 'ingredient_id')
+        )
+        for row in RecipeIngredient.objects.filter(ingredient_id__in=merged).order_by('id'):
+            ingredient_id = merged[row.ingredient_id]
+            # A recipe listing several spellings keeps a single row.
+            if (row.recipe_id, ingredient_id) in linked:
+                row.delete()
+                continue
+            linked.add((row.recipe_id, ingredient_id))
+            row.ingredient_id = ingredient_id
+            row.save(update_fields=['ingredient'])
+        Ingredient.objects.filter(id__in=merged).delete()
+    for ingredient_id, name in canonical.values():
+        Ingredient.objects.filter(id=ingredient_id).exclude(name=name).update(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cooks_corner', '0014_recipe_fanned_out'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_ingredient_spellings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_ingredient_name_ci'),
+        ),
+    ]
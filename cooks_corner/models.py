@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Lower
 from authentication.models import User
+from cooks_corner.images import get_image_storage
 
 
 class Category(models.Model):
@@ -9,13 +12,19 @@ class Category(models.Model):
         return self.name
 
 
+def clean_ingredient_name(name):
+    # Catalog names are stored with runs of whitespace collapsed and compared without case.
+    return ' '.join(name.split())
+
+
 class Ingredient(models.Model):
-    name = models.CharField(max_length=100)
-    quantity = models.IntegerField(default=0)
-    unit_name = models.CharField(max_length=10)
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(Lower('name'), name='unique_ingredient_name_ci')]
 
     def __str__(self):
-        return f"{self.name} ({self.quantity})"
+        return self.name
 
 
 class Recipe(models.Model):
@@ -25,18 +34,54 @@ class Recipe(models.Model):
     category = models.ForeignKey(Category, related_name='recipes', on_delete=models.CASCADE)
     cook_time = models.CharField(max_length=20)
     difficulty = models.CharField(max_length=20, choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')])
-    ingredients = models.ManyToManyField(Ingredient, related_name='recipes')
+    ingredients = models.ManyToManyField(Ingredient, through='RecipeIngredient', related_name='recipes')
+    likes_count = models.PositiveIntegerField(default=0)
+    saves_count = models.PositiveIntegerField(default=0)
+    # Row version for conditional GETs; counter and image writes bump it explicitly.
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by cooks_corner.search; indexed with GIN on PostgreSQL, unused on SQLite (FTS5 table instead).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set once cooks_corner.feed has pushed the recipe into its followers' timelines; until then
+    # (and for good when its author has too many followers) feeds pull it at read time.
+    fanned_out = models.BooleanField(default=False, editable=False)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['id'] 
+        indexes = [
+            models.Index(fields=['author', '-id'], condition=models.Q(fanned_out=False), name='recipe_pulled_idx'),
+        ]
+
+
+class RecipeIngredient(models.Model):
+    recipe = models.ForeignKey(Recipe, related_name='recipe_ingredients', on_delete=models.CASCADE)
+    ingredient = models.ForeignKey(Ingredient, related_name='recipe_ingredients', on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+    unit_name = models.CharField(max_length=10)
+
+    class Meta:
+        unique_together = ('recipe', 'ingredient')
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.ingredient.name} ({self.quantity} {self.unit_name})"
 
 
 class RecipeImage(models.Model):
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (READY, 'Ready'), (FAILED, 'Failed')]
+
     recipe = models.ForeignKey(Recipe, related_name='images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to='recipe_images/')
+    # Empty until the ingestion worker (cooks_corner.images) has pushed the processed file.
+    image = models.ImageField(upload_to='recipe_images/', storage=get_image_storage, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=READY)
+    staged_file = models.CharField(max_length=255, blank=True, editable=False)
+    # {width: {format: storage name}}, see cooks_corner.images.save_variants
+    variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"Image for {self.recipe.title}"
@@ -49,6 +94,11 @@ class SavedRecipe(models.Model):
 
     class Meta:
         unique_together = ('user', 'recipe')
+        # Serve the newest-first cursor pages of the list endpoints, per user and per recipe.
+        indexes = [
+            models.Index(fields=['user', '-saved_on', '-id']),
+            models.Index(fields=['recipe', '-saved_on', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} saved {self.recipe.title}"
@@ -61,6 +111,10 @@ class LikedRecipe(models.Model):
 
     class Meta:
         unique_together = ('user', 'recipe')
+        indexes = [
+            models.Index(fields=['user', '-liked_on', '-id']),
+            models.Index(fields=['recipe', '-liked_on', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} liked {self.recipe.title}"
@@ -73,6 +127,66 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('follower', 'followed')
+        indexes = [
+            models.Index(fields=['follower', '-followed_on', '-id']),
+            models.Index(fields=['followed', '-followed_on', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.follower.username} follows {self.followed.username}"
+
+
+class FeedEntry(models.Model):
+    """
+    Materialized timeline row: `recipe` was fanned out to `user`, who follows its author.
+    """
+    user = models.ForeignKey(User, related_name='feed_entries', on_delete=models.CASCADE)
+    recipe = models.ForeignKey(Recipe, related_name='feed_entries', on_delete=models.CASCADE)
+    author = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        # Also serves the (user, recipe DESC) scan that pages the feed.
+        unique_together = ('user', 'recipe')
+
+    def __str__(self):
+        return f"{self.recipe.title} in the feed of {self.user.username}"
+
+class TrendingScore(models.Model):
+    """
+    Materialized trending rank of a recipe, maintained by cooks_corner.trending.
+    """
+    recipe = models.OneToOneField(Recipe, primary_key=True, related_name='trending', on_delete=models.CASCADE)
+    # Log of the forward-decayed weight of the recipe's likes and saves, comparable between recipes.
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=['score', 'recipe'])]
+
+    def __str__(self):
+        return f"{self.recipe.title} trending at {self.score}"
+
+
+class EventCheckpoint(models.Model):
+    # Last like/save id already processed by an incremental job, e.g. 'trending:likes'.
+    source = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.source} up to {self.last_id}"
+
+
+class RecipeSimilarity(models.Model):
+    """
+    One of the top neighbours of `recipe` by co-interaction, maintained by cooks_corner.similarity.
+    """
+    recipe = models.ForeignKey(Recipe, related_name='similarities', on_delete=models.CASCADE)
+    similar = models.ForeignKey(Recipe, related_name='similar_to', on_delete=models.CASCADE)
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('recipe', 'similar')
+        # Serves the (recipe, score DESC) lookup of the similar endpoint.
+        indexes = [models.Index(fields=['recipe', '-score'])]
 
     def __str__(self):
-        return f"{self.follower.username} follows {self.followed.username}"
\ No newline at end of file
+        return f"{self.similar.title} is similar to {self.recipe.title}"
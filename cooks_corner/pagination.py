@@ -1,17 +1,216 @@
+import json
+from asgiref.sync import sync_to_async
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from drf_yasg import openapi
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Query parameters of the paginations, for the views' swagger_auto_schema(manual_parameters=...).
+PAGE_PARAMETER = openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER)
+LIMIT_PARAMETER = openapi.Parameter('limit', openapi.IN_QUERY, description="Number of results to return per page", type=openapi.TYPE_INTEGER)
+CURSOR_PARAMETER = openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor from the next/previous link", type=openapi.TYPE_STRING)
+PAGINATION_PARAMETER = openapi.Parameter('pagination', openapi.IN_QUERY, description="Set to 'cursor' to use cursor pagination without a total count", type=openapi.TYPE_STRING)
+KEYSET_PARAMETERS = [CURSOR_PARAMETER, LIMIT_PARAMETER]
+PAGE_PARAMETERS = [PAGE_PARAMETER, LIMIT_PARAMETER]
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination keyed on the values of the ordering columns, e.g. `(id)` or
+    `(saved_on, id)`. Pages are fetched with a `WHERE (a, b) > (x, y)` style filter,
+    so there is no total count and no OFFSET scan, whatever the page depth.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 10
+    max_page_size = 100
+    ordering = ('id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Same as paginate_queryset, for async views.
+        return self.set_page([obj async for obj in self.get_page_queryset(queryset, request, view)])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset, view)
+
+        self.position, self.reverse = self.decode_cursor(request, queryset)
+        keys = [(name, not descending) if self.reverse else (name, descending) for name, descending in self.keys]
+
+        if self.position is not None:
+            queryset = queryset.filter(self.get_position_filter(keys, self.position))
+        queryset = queryset.order_by(*[f'-{name}' if descending else name for name, descending in keys])
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = results
+        return results
+
+    def peek_cursor(self, request, queryset, view=None):
+        """
+        Decode the request's cursor before pagination, e.g. to narrow a candidate set first.
+        """
+        self.keys = self.get_keys(queryset, view)
+        return self.decode_cursor(request, queryset)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_keys(self, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        keys = []
+        for field in ordering:
+            assert '__' not in field, 'Keyset pagination only supports fields of the paginated model.'
+            keys.append((field.lstrip('-'), field.startswith('-')))
+
+        # The last key has to be unique, otherwise rows sharing a value could be skipped.
+        pk_name = queryset.model._meta.pk.name
+        if keys[-1][0] not in ('pk', pk_name):
+            keys.append((pk_name, keys[-1][1]))
+        return keys
+
+    def get_position_filter(self, keys, position):
+        condition = Q()
+        for index, (name, descending) in enumerate(keys):
+            lookup = 'lt' if descending else 'gt'
+            step = Q(**{f'{name}__{lookup}': position[index]})
+            for previous_index in range(index):
+                step &= Q(**{keys[previous_index][0]: position[previous_index]})
+            condition |= step
+        return condition
+
+    def get_position(self, obj):
+        opts = obj._meta
+        return [opts.get_field(name).value_to_string(obj) for name, _ in self.keys]
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values, reverse = payload['p'], bool(payload.get('r'))
+            if len(values) != len(self.keys):
+                raise ValueError
+            opts = queryset.model._meta
+            position = [opts.get_field(name).to_python(value) for (name, _), value in zip(self.keys, values)]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, 'page')
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_fingerprint(self):
+        # Everything besides the rows themselves that shapes the paginated response.
+        return 'cursor', self.has_next, self.has_previous
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
 
 
 class CustomPagination(pagination.PageNumberPagination):
     page_size_query_param = 'limit'
     page_query_param = 'page'
     page_size = 10
+    # Клиенты переключаются на курсорный режим параметром ?cursor=... или ?pagination=cursor
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    keyset_pagination_class = KeysetPagination
 
-    def get_paginated_response(self, data):
-        return Response({
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Same as paginate_queryset, for async views; the page mode counts and slices in a thread.
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = self.keyset_pagination_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        return await sync_to_async(super().paginate_queryset)(queryset, request, view)
+
+    def use_keyset(self, request, view):
+        if view is not None and getattr(view, 'cursor_ordering', ()) is None:
+            return False
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def get_fingerprint(self):
+        if self.keyset is not None:
+            return self.keyset.get_fingerprint()
+        return 'page', self.page.number, self.page.paginator.count
+
+    def get_paginated_data(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_data(data)
+
+        return {
             'page': self.page.number,  # Номер текущей страницы
             'count': self.page.paginator.count,  # Общее количество элементов
             'next': self.get_next_link(),  # Ссылка на следующую страницу
             'previous': self.get_previous_link(),  # Ссылка на предыдущую страницу
             'results': data  # Сами данные
-        })
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
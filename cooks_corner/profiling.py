@@ -0,0 +1,246 @@
+import asyncio
+import cProfile
+import marshal
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from authentication.authentication import CachedJWTAuthentication
+
+
+CPROFILE = 'cprofile'
+SAMPLE = 'sample'
+MODES = (CPROFILE, SAMPLE)
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = 'profile'
+
+
+def get_profile_storage():
+    return FileSystemStorage(location=settings.PROFILING_ROOT)
+
+
+def collapse(frame):
+    # One line of the collapsed-stack format read by flamegraph.pl and speedscope: root;...;leaf
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the stacks of the given threads every
+    PROFILING_INTERVAL seconds, and those of the event loop thread while `task` is the task it
+    runs. The profiled code is not instrumented, so its cost stays low and independent of how
+    many calls it makes.
+    """
+
+    def __init__(self, thread_ids=(), task=None):
+        self.thread_ids = set(thread_ids)
+        self.task = task
+        if task is not None:
+            # Created from the task itself, so this is the loop's thread.
+            self.loop, self.loop_thread_id = task.get_loop(), threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def is_running_task(self):
+        return self.task is not None and asyncio.current_task(self.loop) is self.task
+
+    def run(self):
+        while not self.stopped.wait(settings.PROFILING_INTERVAL):
+            running = self.is_running_task()
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                if thread_id in frames:
+                    self.stacks[collapse(frames[thread_id])] += 1
+            # Other requests' tasks run on the same thread between two awaits of this one.
+            if running and self.is_running_task() and self.loop_thread_id in frames:
+                self.stacks[collapse(frames[self.loop_thread_id])] += 1
+
+    def dump(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class SamplingBudget:
+    """
+    Random sampling of 1 in PROFILING_SAMPLE_RATE requests, skipped while the time spent in
+    sampled requests exceeds PROFILING_MAX_SHARE of the process uptime.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.spent = 0.0
+
+    def draw(self):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate <= 0 or random.randrange(rate):
+            return False
+        with self.lock:
+            return self.spent <= settings.PROFILING_MAX_SHARE * (time.monotonic() - self.started)
+
+    def charge(self, duration):
+        with self.lock:
+            self.spent += duration
+
+
+budget = SamplingBudget()
+cprofile_lock = threading.Lock()
+
+
+def asks_for_profile(request):
+    return bool(request.META.get(HEADER) or request.GET.get(QUERY_PARAM))
+
+
+def get_requested_mode(request):
+    mode = request.META.get(HEADER) or request.GET.get(QUERY_PARAM)
+    if not mode:
+        return None
+    mode = mode.strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode '{mode}', expected one of: {', '.join(MODES)}.")
+    return mode
+
+
+def is_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return result is not None and result[0].is_staff
+
+
+def save_profile(request, mode, content):
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name if match is not None and match.view_name else 'unmatched').replace(':', '-')
+    extension = 'prof' if mode == CPROFILE else 'collapsed'
+    name = f"{timezone.now():%Y%m%d-%H%M%S}-{view}-{uuid.uuid4().hex[:8]}.{extension}"
+    storage = get_profile_storage()
+    name = storage.save(name, ContentFile(content))
+    prune_profiles(storage)
+    return name
+
+
+def prune_profiles(storage):
+    # File names start with the timestamp, so sorting them sorts by age.
+    _, names = storage.listdir('')
+    for name in sorted(names)[:-settings.PROFILING_MAX_FILES]:
+        storage.delete(name)
+
+
+def dump_cprofile(profiler):
+    # marshal-ed pstats, as written by cProfile.Profile.dump_stats
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests and store the result under PROFILING_ROOT, served by ProfileDownloadView.
+
+    Staff users ask for it with an `X-Profile: cprofile|sample` header or `?profile=cprofile|sample`;
+    other requests are sampled at random (see SamplingBudget). The stored profile's name comes
+    back in the X-Profile-Id header of the requested profiles only; sampled ones are listed by
+    ProfileListView.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_mode(self, request, staff):
+        # Only staff requests can ask for a mode; for the others the header is ignored.
+        if staff:
+            return get_requested_mode(request), False
+        return (SAMPLE, True) if budget.draw() else (None, False)
+
+    def reject(self, error):
+        return JsonResponse({'detail': str(error)}, status=400)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            mode, sampled = self.get_mode(request, asks_for_profile(request) and is_staff(request))
+        except ValueError as error:
+            return self.reject(error)
+        if mode is None:
+            return self.get_response(request)
+
+        started = time.monotonic()
+        # cProfile cannot run in two threads at once on every Python version; sample instead.
+        if mode == CPROFILE and cprofile_lock.acquire(blocking=False):
+            try:
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+            finally:
+                cprofile_lock.release()
+            content = dump_cprofile(profiler)
+        else:
+            mode = SAMPLE
+            sampler = StackSampler({threading.get_ident()})
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+            content = sampler.dump()
+        return self.finish(request, response, mode, sampled, content, started)
+
+    async def __acall__(self, request):
+        staff = asks_for_profile(request) and await sync_to_async(is_staff)(request)
+        try:
+            mode, sampled = self.get_mode(request, staff)
+        except ValueError as error:
+            return self.reject(error)
+        if mode is None:
+            return await self.get_response(request)
+
+        # Async requests hop between the event loop and sync_to_async threads, so cProfile (one
+        # thread) would miss most of the work: they are always sampled, in the request's task and
+        # in the thread its thread-sensitive sync_to_async calls run in (one per request under ASGI).
+        # Calls made with thread_sensitive=False run in a shared pool and are not attributed.
+        mode, started = SAMPLE, time.monotonic()
+        sync_thread_id = await sync_to_async(threading.get_ident)()
+        sampler = StackSampler({sync_thread_id}, task=asyncio.current_task())
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(sampler.stop, thread_sensitive=False)()
+        return await sync_to_async(self.finish, thread_sensitive=False)(
+            request, response, mode, sampled, sampler.dump(), started
+        )
+
+    def finish(self, request, response, mode, sampled, content, started):
+        name = save_profile(request, mode, content)
+        if sampled:
+            budget.charge(time.monotonic() - started)
+        else:
+            response['X-Profile-Id'] = name
+        return response
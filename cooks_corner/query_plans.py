@@ -0,0 +1,26 @@
+def plan_queryset(queryset, serializer_class):
+    """
+    Apply the relations a serializer declares in its Meta so that serializing
+    a page of objects costs a fixed number of queries.
+
+    Serializers declare `select_related` (single-valued relations read per row)
+    and `prefetch_related` (multi-valued relations, strings or Prefetch objects).
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    select_related = getattr(meta, 'select_related', ())
+    prefetch_related = getattr(meta, 'prefetch_related', ())
+
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class QueryPlanMixin:
+    """
+    Generic view mixin that builds the queryset from the serializer's declared relations.
+    """
+
+    def get_queryset(self):
+        return plan_queryset(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,59 @@
+from django.db import transaction
+from authentication.models import User
+from cooks_corner import feed
+from cooks_corner.counters import increment_counter, decrement_counter
+from cooks_corner.models import Follow, LikedRecipe, Recipe, SavedRecipe
+
+
+class Relation:
+    """
+    A (user, target) relation model with the counters and feed entries that follow it.
+
+    `add` and `remove` change a single row and its derived data in one transaction. Both the
+    DRF create/destroy views and the async views (through sync_to_async) write through them.
+    """
+
+    def __init__(self, model, owner_field, target_model, target_field, target_counter, owner_counter=None,
+                 on_added=None, on_removed=None):
+        self.model = model
+        self.owner_field = owner_field
+        self.target_model = target_model
+        self.target_field = target_field
+        self.target_counter = target_counter
+        self.owner_counter = owner_counter
+        self.on_added = on_added
+        self.on_removed = on_removed
+
+    def get_lookup(self, owner, target_id):
+        return {self.owner_field: owner, f'{self.target_field}_id': target_id}
+
+    def add(self, owner, target_id):
+        # Raises IntegrityError when the row already exists.
+        with transaction.atomic():
+            instance = self.model.objects.create(**self.get_lookup(owner, target_id))
+            increment_counter(self.target_model, target_id, self.target_counter)
+            if self.owner_counter:
+                increment_counter(User, owner.pk, self.owner_counter)
+            if self.on_added:
+                self.on_added(owner.pk, target_id)
+        return instance
+
+    def remove(self, owner, target_id):
+        with transaction.atomic():
+            deleted, _ = self.model.objects.filter(**self.get_lookup(owner, target_id)).delete()
+            if not deleted:
+                return False
+            decrement_counter(self.target_model, target_id, self.target_counter)
+            if self.owner_counter:
+                decrement_counter(User, owner.pk, self.owner_counter)
+            if self.on_removed:
+                self.on_removed(owner.pk, target_id)
+        return True
+
+
+likes = Relation(LikedRecipe, 'user', Recipe, 'recipe', 'likes_count')
+saves = Relation(SavedRecipe, 'user', Recipe, 'recipe', 'saves_count')
+follows = Relation(
+    Follow, 'follower', User, 'followed', 'followers_count', 'following_count',
+    on_added=feed.backfill_follow, on_removed=feed.remove_follow,
+)
@@ -0,0 +1,125 @@
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, TextField, Value, When
+from django.db.models.expressions import RawSQL
+from cooks_corner.models import Recipe
+
+
+# 'simple' keeps the index language-agnostic: recipes are written in English and Russian.
+SEARCH_CONFIG = 'simple'
+FTS_TABLE = 'cooks_corner_recipe_fts'
+# SQLite ranks in Python, so the ranked endpoint is capped to the best matches.
+RANKED_RESULTS_LIMIT = 500
+# Column weights for bm25(): title, description, ingredients.
+FTS_WEIGHTS = (10.0, 4.0, 2.0)
+
+
+def uses_tsvector():
+    return connection.vendor == 'postgresql'
+
+
+def uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def get_document(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).values('title', 'description').first()
+    if recipe is None:
+        return None
+    names = Recipe.ingredients.through.objects.filter(recipe_id=recipe_id).values_list('ingredient__name', flat=True)
+    recipe['ingredients'] = ' '.join(names)
+    return recipe
+
+
+def index_recipe(recipe_id):
+    if uses_tsvector():
+        document = get_document(recipe_id)
+        if document is None:
+            return
+        ingredients = Value(document['ingredients'], output_field=TextField())
+        Recipe.objects.filter(pk=recipe_id).update(
+            search_vector=(
+                SearchVector('title', weight='A', config=SEARCH_CONFIG)
+                + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+                + SearchVector(ingredients, weight='C', config=SEARCH_CONFIG)
+            )
+        )
+    elif uses_fts5():
+        document = get_document(recipe_id)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe_id])
+            if document is not None:
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, description, ingredients) VALUES (%s, %s, %s, %s)',
+                    [recipe_id, document['title'], document['description'], document['ingredients']],
+                )
+
+
+def remove_recipe(recipe_id):
+    # On PostgreSQL the vector lives on the recipe row and goes away with it.
+    if uses_fts5():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe_id])
+
+
+def rebuild_index():
+    recipe_ids = Recipe.objects.values_list('id', flat=True)
+    if uses_fts5():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    count = 0
+    for recipe_id in recipe_ids.iterator(chunk_size=500):
+        index_recipe(recipe_id)
+        count += 1
+    return count
+
+
+def to_fts5_query(text):
+    # Quote every term so user input can never be parsed as FTS5 syntax; terms are AND-ed.
+    terms = re.findall(r'\w+', text)
+    return ' '.join('"%s"*' % term for term in terms)
+
+
+def filter_recipes(queryset, text):
+    """
+    Restrict the queryset to recipes matching the text, keeping its ordering.
+    """
+    if uses_tsvector():
+        return queryset.filter(search_vector=SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG))
+    if uses_fts5():
+        match = to_fts5_query(text)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+    return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+
+
+def search_recipes(queryset, text):
+    """
+    Filter the queryset by the text and order it by relevance, best match first.
+    """
+    if uses_tsvector():
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', 'id')
+        )
+    if uses_fts5():
+        match = to_fts5_query(text)
+        if not match:
+            return queryset.none()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({FTS_TABLE}, %s, %s, %s) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY 2 LIMIT %s',
+                [*FTS_WEIGHTS, match, RANKED_RESULTS_LIMIT],
+            )
+            ranked = cursor.fetchall()
+        if not ranked:
+            return queryset.none()
+        # bm25() is lower for better matches, so negate it to sort descending like SearchRank.
+        rank = Case(*[When(pk=recipe_id, then=Value(-score)) for recipe_id, score in ranked], output_field=FloatField())
+        return queryset.filter(pk__in=[recipe_id for recipe_id, _ in ranked]).annotate(rank=rank).order_by('-rank', 'id')
+    return filter_recipes(queryset, text).order_by('id')
@@ -1,6 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
-from cooks_corner.models import Recipe, Ingredient, Category, LikedRecipe, SavedRecipe, Follow, RecipeImage
+from cooks_corner.models import (
+    Recipe, Ingredient, RecipeIngredient, Category, LikedRecipe, SavedRecipe, Follow, RecipeImage, clean_ingredient_name,
+)
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.functions import Lower
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -16,6 +21,7 @@ class LikedRecipeListSerializer(serializers.ModelSerializer):
         model = LikedRecipe
         fields = ['id', 'user', 'recipe', 'liked_on']
         read_only_fields = ['liked_on']
+        select_related = ['user']
 
 
 class LikedRecipeSerializer(serializers.ModelSerializer):
@@ -43,7 +49,7 @@ class FollowListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ['id', 'follower', 'followed', 'followed_on']
-        read_only_fields = ['saved_on']
+        read_only_fields = ['followed_on']
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -53,63 +59,145 @@ class FollowSerializer(serializers.ModelSerializer):
         read_only_fields = ['followed_on']
 
 
+class BatchActionSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+
+    def validate(self, attrs):
+        add, remove = list(dict.fromkeys(attrs['add'])), list(dict.fromkeys(attrs['remove']))
+        if len(add) + len(remove) > settings.BATCH_MAX_SIZE:
+            raise serializers.ValidationError(f'At most {settings.BATCH_MAX_SIZE} ids per request.')
+        if set(add) & set(remove):
+            raise serializers.ValidationError('An id cannot be both added and removed.')
+        return {'add': add, 'remove': remove}
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ingredient
+        fields = ['id', 'name']
+
+
+class RecipeIngredientSerializer(serializers.ModelSerializer):
+    # Keeps the previous flat shape: id and name come from the catalog entry.
+    id = serializers.IntegerField(source='ingredient_id', read_only=True)
+    name = serializers.CharField(source='ingredient.name', max_length=100)
+
+    class Meta:
+        model = RecipeIngredient
         fields = ['id', 'name', 'quantity', 'unit_name']
 
 
+def build_file_url(storage, name, request=None):
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
 class RecipeImageSerializer(serializers.ModelSerializer):
     recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+    image = serializers.ImageField()
+    variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = RecipeImage
-        fields = ['id', 'recipe', 'image']
+        fields = ['id', 'recipe', 'image', 'status', 'variants', 'srcset']
+        read_only_fields = ['status']
+
+    def get_variants(self, obj):
+        storage = obj.image.storage
+        request = self.context.get('request')
+        return {
+            width: {format: build_file_url(storage, name, request) for format, name in formats.items()}
+            for width, formats in obj.variants.items()
+        }
+
+    def get_srcset(self, obj):
+        # Ready-made values for <source srcset> / <img srcset>, one per format.
+        srcset = {}
+        for width, formats in sorted(self.get_variants(obj).items(), key=lambda item: int(item[0])):
+            for format, url in formats.items():
+                srcset.setdefault(format, []).append(f'{url} {width}w')
+        return {format: ', '.join(candidates) for format, candidates in srcset.items()}
 
 
 class RecipeListSerializer(serializers.ModelSerializer):
-    likes_count = serializers.SerializerMethodField()
-    saves_count = serializers.SerializerMethodField()
     author_name = serializers.SerializerMethodField()
     images = RecipeImageSerializer(many=True, read_only=True)
+    thumbnail = serializers.SerializerMethodField()
+    # Per viewer, added to the response by cooks_corner.viewer_state.ViewerStateMixin
+    is_liked = serializers.BooleanField(read_only=True)
+    is_saved = serializers.BooleanField(read_only=True)
+    author_followed = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Recipe
-        fields = ['id', 'title', 'author', 'author_name', 'category', 'images', 'likes_count', 'saves_count']
-
-    def get_likes_count(self, obj):
-        return LikedRecipe.objects.filter(recipe=obj).count()
-
-    def get_saves_count(self, obj):
-        return SavedRecipe.objects.filter(recipe=obj).count()
+        fields = [
+            'id', 'title', 'author', 'author_name', 'category', 'images', 'thumbnail', 'likes_count', 'saves_count',
+            'is_liked', 'is_saved', 'author_followed',
+        ]
+        read_only_fields = ['likes_count', 'saves_count']
+        select_related = ['author', 'category']
+        prefetch_related = ['images']
 
     def get_author_name(self, obj):
         return obj.author.username 
 
+    def get_thumbnail(self, obj):
+        # Smallest JPEG variant of the first ready image at least IMAGE_THUMBNAIL_WIDTH wide, for list cards.
+        image = next((image for image in obj.images.all() if image.status == RecipeImage.READY and image.image), None)
+        if image is None:
+            return None
+        # The original is used when it is no wider than that.
+        widths = sorted(int(width) for width in image.variants if int(width) >= settings.IMAGE_THUMBNAIL_WIDTH)
+        name = image.variants[str(widths[0])]['jpeg'] if widths else image.image.name
+        return build_file_url(image.image.storage, name, self.context.get('request'))
+
+
+class IngredientMatchSerializer(RecipeListSerializer):
+    # Set on the recipes by the ingredient finder view.
+    matched_ingredients = serializers.IntegerField(read_only=True)
+    missing_ingredients = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + ['matched_ingredients', 'missing_ingredients']
+
 
 class RecipeSerializer(serializers.ModelSerializer):
-    ingredients = IngredientSerializer(many=True)
+    ingredients = RecipeIngredientSerializer(many=True, source='recipe_ingredients')
     images = RecipeImageSerializer(many=True, read_only=True)
-    likes_count = serializers.SerializerMethodField()
-    saves_count = serializers.SerializerMethodField()
     author_name = serializers.SerializerMethodField()
+    is_liked = serializers.BooleanField(read_only=True)
+    is_saved = serializers.BooleanField(read_only=True)
+    author_followed = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Recipe
-        fields = ['id', 'title', 'author', 'author_name', 'description', 'category', 'cook_time', 'difficulty', 'ingredients', 'likes_count', 'saves_count', 'images']
+        fields = [
+            'id', 'title', 'author', 'author_name', 'description', 'category', 'cook_time', 'difficulty', 'ingredients',
+            'likes_count', 'saves_count', 'images', 'is_liked', 'is_saved', 'author_followed',
+        ]
+        read_only_fields = ['likes_count', 'saves_count']
+        select_related = ['author', 'category']
+        prefetch_related = [
+            'images',
+            Prefetch('recipe_ingredients', queryset=RecipeIngredient.objects.select_related('ingredient')),
+        ]
 
     def create(self, validated_data):
-        ingredients_data = validated_data.pop('ingredients')
+        ingredients_data = validated_data.pop('recipe_ingredients')
         with transaction.atomic():  # Using atomic transaction to ensure data integrity
             recipe = Recipe.objects.create(**validated_data)
-            for ingredient_data in ingredients_data:
-                ingredient, created = Ingredient.objects.get_or_create(**ingredient_data)
-                recipe.ingredients.add(ingredient)
+            RecipeIngredient.objects.bulk_create([
+                RecipeIngredient(recipe=recipe, ingredient=ingredient, quantity=quantity, unit_name=unit_name)
+                for ingredient, quantity, unit_name in self.resolve_ingredients(ingredients_data)
+            ])
+        self.prefetch_ingredients(recipe)
         return recipe
 
     def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop('ingredients')
-        
+        ingredients_data = validated_data.pop('recipe_ingredients')
+
         with transaction.atomic():
             instance.title = validated_data.get('title', instance.title)
             instance.description = validated_data.get('description', instance.description)
@@ -117,21 +205,65 @@ class RecipeSerializer(serializers.ModelSerializer):
             instance.difficulty = validated_data.get('difficulty', instance.difficulty)
             instance.save()
 
-            # Clear existing ingredients
-            instance.ingredients.clear()
-
-            # Add updated ingredients
-            for ingredient_data in ingredients_data:
-                ingredient, created = Ingredient.objects.get_or_create(**ingredient_data)
-                instance.ingredients.add(ingredient)
-
+            # Only touch the rows that actually changed
+            current = {row.ingredient_id: row for row in instance.recipe_ingredients.all()}
+            to_create, to_update, kept_ids = [], [], set()
+            for ingredient, quantity, unit_name in self.resolve_ingredients(ingredients_data):
+                kept_ids.add(ingredient.pk)
+                row = current.get(ingredient.pk)
+                if row is None:
+                    to_create.append(RecipeIngredient(recipe=instance, ingredient=ingredient, quantity=quantity, unit_name=unit_name))
+                elif (row.quantity, row.unit_name) != (quantity, unit_name):
+                    row.quantity, row.unit_name = quantity, unit_name
+                    to_update.append(row)
+
+            removed_ids = set(current) - kept_ids
+            if removed_ids:
+                instance.recipe_ingredients.filter(ingredient_id__in=removed_ids).delete()
+            if to_update:
+                RecipeIngredient.objects.bulk_update(to_update, ['quantity', 'unit_name'])
+            if to_create:
+                RecipeIngredient.objects.bulk_create(to_create)
+
+        self.prefetch_ingredients(instance)
         return instance
-    
-    def get_likes_count(self, obj):
-        return LikedRecipe.objects.filter(recipe=obj).count()
 
-    def get_saves_count(self, obj):
-        return SavedRecipe.objects.filter(recipe=obj).count()
+    def prefetch_ingredients(self, recipe):
+        # Load the written rows in one query so the response does not fetch each ingredient name separately.
+        getattr(recipe, '_prefetched_objects_cache', {}).pop('recipe_ingredients', None)
+        prefetch_related_objects(
+            [recipe], Prefetch('recipe_ingredients', queryset=RecipeIngredient.objects.select_related('ingredient'))
+        )
+
+    def resolve_ingredients(self, ingredients_data):
+        """
+        Map the payload onto catalog ingredients, returning (ingredient, quantity, unit_name) tuples.
+        """
+        entries = {}
+        for ingredient_data in ingredients_data:
+            name = clean_ingredient_name(ingredient_data['ingredient']['name'])
+            entries.setdefault(name.lower(), (name, ingredient_data.get('quantity', 0), ingredient_data['unit_name']))
+        catalog = self.get_or_create_ingredients([name for name, _, _ in entries.values()])
+        return [(catalog[key], quantity, unit_name) for key, (_, quantity, unit_name) in entries.items()]
+
+    def get_or_create_ingredients(self, names):
+        """
+        Resolve catalog rows by lowercased name, with one lookup and one bulk insert for the missing ones.
+        """
+        if not names:
+            return {}
+        keys = [name.lower() for name in names]
+        catalog = self.find_ingredients(keys)
+        missing = [Ingredient(name=name) for name in names if name.lower() not in catalog]
+        if missing:
+            # A concurrent writer may have added some of the names meanwhile, so skip conflicts and re-read.
+            Ingredient.objects.bulk_create(missing, ignore_conflicts=True)
+            catalog = self.find_ingredients(keys)
+        return catalog
+
+    def find_ingredients(self, keys):
+        ingredients = Ingredient.objects.annotate(key=Lower('name')).filter(key__in=keys)
+        return {ingredient.name.lower(): ingredient for ingredient in ingredients}
 
     def get_author_name(self, obj):
         return obj.author.username 
@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from authentication.models import User
+from cooks_corner import ingredient_index, search
+from cooks_corner.cache import invalidate_recipes
+from cooks_corner.counters import increment_counter, decrement_counter
+from cooks_corner.models import Ingredient, Recipe, RecipeImage, RecipeIngredient, LikedRecipe, SavedRecipe
+
+
+@receiver(post_save, sender=Recipe)
+def index_saved_recipe(sender, instance, **kwargs):
+    # RecipeSerializer writes the ingredient rows (bulk writes, without m2m signals) in the same
+    # transaction as the recipe, so both indexes see them by then.
+    transaction.on_commit(lambda: search.index_recipe(instance.pk))
+    transaction.on_commit(lambda: ingredient_index.index_recipe(instance.pk))
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_deleted_recipe(sender, instance, **kwargs):
+    # delete() clears instance.pk before the transaction commits.
+    recipe_id = instance.pk
+    transaction.on_commit(lambda: search.remove_recipe(recipe_id))
+    transaction.on_commit(lambda: ingredient_index.remove_recipe(recipe_id))
+
+
+def reindex_recipes(recipe_ids):
+    def reindex():
+        for recipe_id in recipe_ids:
+            search.index_recipe(recipe_id)
+            ingredient_index.index_recipe(recipe_id)
+
+    transaction.on_commit(reindex)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def reindex_recipe_ingredients(sender, instance, **kwargs):
+    # Single row writes outside RecipeSerializer (admin inlines, scripts): the recipe row is not
+    # saved, so bump its version for the response cache and the other processes' ingredient index.
+    Recipe.objects.filter(pk=instance.recipe_id).update(updated_at=Now())
+    invalidate_recipes(instance.recipe_id)
+    reindex_recipes([instance.recipe_id])
+
+
+@receiver(pre_save, sender=Ingredient)
+def detect_ingredient_rename(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and 'name' not in update_fields):
+        instance._renamed = False
+        return
+    previous = Ingredient.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    instance._renamed = previous is not None and previous != instance.name
+
+
+@receiver(post_save, sender=Ingredient)
+def reindex_renamed_ingredient(sender, instance, created, **kwargs):
+    if not created and getattr(instance, '_renamed', False):
+        recipe_ids = list(instance.recipe_ingredients.values_list('recipe_id', flat=True))
+        Recipe.objects.filter(pk__in=recipe_ids).update(updated_at=Now())
+        invalidate_recipes(*recipe_ids)
+        reindex_recipes(recipe_ids)
+
+
+@receiver(post_save, sender=Recipe)
+def count_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        increment_counter(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    decrement_counter(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    invalidate_recipes(instance.pk)
+
+
+@receiver(post_save, sender=RecipeImage)
+@receiver(post_delete, sender=RecipeImage)
+@receiver(post_save, sender=LikedRecipe)
+@receiver(post_delete, sender=LikedRecipe)
+@receiver(post_save, sender=SavedRecipe)
+@receiver(post_delete, sender=SavedRecipe)
+def invalidate_related_recipe(sender, instance, **kwargs):
+    invalidate_recipes(instance.recipe_id)
+
+
+@receiver(pre_save, sender=User)
+def detect_author_name_change(sender, instance, update_fields=None, **kwargs):
+    # Recipe responses embed the author's username, no other user field.
+    if instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        instance._author_name_changed = False
+        return
+    previous = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    instance._author_name_changed = previous is not None and previous != instance.username
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_recipes(sender, instance, created, **kwargs):
+    if not created and getattr(instance, '_author_name_changed', False):
+        invalidate_recipes(*instance.recipes.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=RecipeImage)
+@receiver(post_delete, sender=RecipeImage)
+def touch_recipe(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id).update(updated_at=Now())
@@ -0,0 +1,141 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from scipy import sparse
+from cooks_corner.models import EventCheckpoint, LikedRecipe, Recipe, RecipeSimilarity, SavedRecipe
+from cooks_corner.trending import get_settled_events
+
+
+# checkpoint source -> (event model, event timestamp field)
+SOURCES = {
+    'likes': (LikedRecipe, 'liked_on'),
+    'saves': (SavedRecipe, 'saved_on'),
+}
+
+
+def load_interactions(user_filter=Q()):
+    pairs = []
+    for model, _ in SOURCES.values():
+        pairs.extend(model.objects.filter(user_filter).values_list('user_id', 'recipe_id').iterator(chunk_size=10000))
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def build_matrix(pairs):
+    """
+    Sparse user x recipe matrix: 1 per like or save, so 2 where a user did both.
+    Returns the recipe id of every column and the matrix.
+    """
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    recipe_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs)), (rows, columns)), shape=(len(user_ids), len(recipe_ids))
+    )
+    return recipe_ids, matrix
+
+
+def get_popularity(recipe_ids):
+    # Column sums of the full matrix, read from the counter columns instead of recounted.
+    popularity = dict(
+        Recipe.objects.filter(pk__in=recipe_ids.tolist()).values_list('pk', F('likes_count') + F('saves_count'))
+    )
+    return np.array([max(popularity.get(recipe_id, 0), 1) for recipe_id in recipe_ids.tolist()], dtype=np.float64)
+
+
+def get_neighbours(targets, recipe_ids, matrix, popularity):
+    """
+    Yield (recipe id, neighbour ids, scores) for the target recipes, keeping the top
+    SIMILAR_RECIPES_COUNT neighbours by co-interactions / sqrt(popularity * popularity).
+    """
+    count = settings.SIMILAR_RECIPES_COUNT
+    positions = np.searchsorted(recipe_ids, targets)
+    cooccurrences = (matrix[:, positions].T @ matrix).tocsr()
+    for row, (recipe_id, position) in enumerate(zip(targets.tolist(), positions.tolist())):
+        start, end = cooccurrences.indptr[row], cooccurrences.indptr[row + 1]
+        columns, counts = cooccurrences.indices[start:end], cooccurrences.data[start:end]
+        keep = columns != position
+        columns, counts = columns[keep], counts[keep]
+        scores = counts / np.sqrt(popularity[position] * popularity[columns])
+        if len(scores) > count:
+            top = np.argpartition(-scores, count)[:count]
+            columns, scores = columns[top], scores[top]
+        yield recipe_id, recipe_ids[columns], scores
+
+
+def recompute(targets=None, chunk_size=1000):
+    """
+    Recompute the neighbours of the target recipes (all of them when None).
+
+    Only the interactions of users who liked or saved a target are loaded, which is
+    all that the targets' co-occurrence rows depend on.
+    """
+    if targets is None:
+        pairs = load_interactions()
+    else:
+        targets = list(targets)
+        pairs = load_interactions(
+            Q(user_id__in=LikedRecipe.objects.filter(recipe_id__in=targets).values('user_id'))
+            | Q(user_id__in=SavedRecipe.objects.filter(recipe_id__in=targets).values('user_id'))
+        )
+
+    recipe_ids, matrix = build_matrix(pairs)
+    popularity = get_popularity(recipe_ids)
+    full = targets is None
+    targets = recipe_ids if full else np.array(sorted(targets), dtype=np.int64)
+    # Targets without interactions left simply lose their neighbours.
+    known = targets[np.isin(targets, recipe_ids)]
+
+    with transaction.atomic():
+        if full:
+            RecipeSimilarity.objects.all().delete()
+        else:
+            RecipeSimilarity.objects.filter(recipe_id__in=targets.tolist()).delete()
+        for start in range(0, len(known), chunk_size):
+            RecipeSimilarity.objects.bulk_create([
+                RecipeSimilarity(recipe_id=recipe_id, similar_id=similar_id, score=score)
+                for recipe_id, similar_ids, scores in get_neighbours(known[start:start + chunk_size], recipe_ids, matrix, popularity)
+                for similar_id, score in zip(similar_ids.tolist(), scores.tolist())
+            ], batch_size=1000)
+    return len(targets)
+
+
+def update_similarities(chunk_size=1000):
+    """
+    Recompute the neighbours of every recipe whose co-occurrences changed since the last run:
+    all recipes of the users with new, settled (see get_settled_events) likes or saves.
+    Returns the number of recipes updated.
+
+    Scores of untouched recipes that merely co-occur with a changed one drift slightly
+    (its popularity changed), removed likes and saves are not seen, and events of transactions
+    that outlasted EVENT_SETTLE_SECONDS are missed; `rebuild_similarities` (scheduled in
+    PERIODIC_TASKS) recomputes everything.
+    """
+    with transaction.atomic():
+        checkpoints, user_ids = {}, set()
+        for source, (model, timestamp_field) in SOURCES.items():
+            checkpoint, _ = EventCheckpoint.objects.select_for_update().get_or_create(source=f'similar:{source}')
+            events = list(get_settled_events(model, timestamp_field, checkpoint.last_id).values_list('pk', 'user_id'))
+            if events:
+                checkpoint.last_id = max(pk for pk, _ in events)
+                user_ids.update(user_id for _, user_id in events)
+            checkpoints[source] = checkpoint
+        if not user_ids:
+            return 0
+
+        targets = set()
+        for model, _ in SOURCES.values():
+            targets.update(model.objects.filter(user_id__in=user_ids).values_list('recipe_id', flat=True))
+        count = recompute(targets, chunk_size)
+        for checkpoint in checkpoints.values():
+            checkpoint.save(update_fields=['last_id'])
+    return count
+
+
+def rebuild_similarities(chunk_size=1000):
+    with transaction.atomic():
+        for source, (model, timestamp_field) in SOURCES.items():
+            # Later events are read again by the next update_similarities, once settled.
+            settled = get_settled_events(model, timestamp_field, 0)
+            last_id = settled.order_by('-pk').values_list('pk', flat=True).first() or 0
+            EventCheckpoint.objects.update_or_create(source=f'similar:{source}', defaults={'last_id': last_id})
+        return recompute(None, chunk_size)
@@ -1,3 +1,1268 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.authentication import user_cache
+from authentication.models import User
+from config import schema
+from cooks_corner import feed, images, ingredient_index, metrics, profiling, similarity, trending
+from cooks_corner.cache import LIST_NAMESPACE, bump_versions, get_versions, invalidate_recipes, recipe_namespace
+from cooks_corner.counters import decrement_counter, find_drifted, increment_counter, sync_counters
+from cooks_corner.export import parse_since, stream
+from cooks_corner.models import (
+    Category, EventCheckpoint, FeedEntry, Ingredient, LikedRecipe, Recipe, RecipeImage, RecipeIngredient,
+    RecipeSimilarity, SavedRecipe, TrendingScore,
+)
+from cooks_corner.serializers import RecipeSerializer
 
-# Create your tests here.
+
+def make_user(name, **kwargs):
+    return User.objects.create_user(username=name, email=f'{name}@example.com', password='password123', **kwargs)
+
+
+def make_recipe(author, category, title='Soup'):
+    return Recipe.objects.create(
+        title=title, author=author, category=category, description='Hot', cook_time='10', difficulty='Easy',
+    )
+
+
+class CookscornerTestCase(APITestCase):
+    def setUp(self):
+        # Response cache and authenticated users live in module-level state shared between tests.
+        cache.clear()
+        user_cache.entries.clear()
+        ingredient_index.index = ingredient_index.IngredientIndex()
+        self.author = make_user('author')
+        self.user = make_user('reader')
+        self.category = Category.objects.create(name='Soups')
+        self.client.force_authenticate(self.user)
+
+    def login(self, user):
+        # A real token, for the code that authenticates before DRF does (middleware, viewer state).
+        self.client.force_authenticate(None)
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def make_image(width, height, format='JPEG', **options):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(output, format=format, **options)
+    return output.getvalue()
+
+
+def follow(client, url):
+    # Links are absolute, the test client only needs the path and query.
+    return client.get(url.replace('http://testserver', ''))
+
+
+class CounterTests(CookscornerTestCase):
+    def test_relation_views_keep_counters(self):
+        recipe = make_recipe(self.author, self.category)
+        self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.likes_count, 1)
+
+        self.assertEqual(self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk}).status_code, 400)
+        self.assertEqual(self.client.delete(f'/cookscorner/like-recipes/delete/{recipe.pk}/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/cookscorner/like-recipes/delete/{recipe.pk}/').status_code, 404)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.likes_count, 0)
+
+    def test_increment_and_decrement(self):
+        recipe = make_recipe(self.author, self.category)
+        increment_counter(Recipe, recipe.pk, 'likes_count')
+        increment_counter(Recipe, recipe.pk, 'likes_count')
+        decrement_counter(Recipe, recipe.pk, 'likes_count')
+        decrement_counter(Recipe, recipe.pk, 'saves_count')
+        recipe.refresh_from_db()
+        self.assertEqual((recipe.likes_count, recipe.saves_count), (1, 0))
+
+    def test_sync_counters(self):
+        recipe = make_recipe(self.author, self.category)
+        untouched = make_recipe(self.author, self.category, title='Stew')
+        LikedRecipe.objects.create(user=self.user, recipe=recipe)
+        SavedRecipe.objects.create(user=self.user, recipe=recipe)
+        version = untouched.updated_at
+
+        self.assertEqual(list(find_drifted(Recipe).values_list('pk', flat=True)), [recipe.pk])
+        self.assertEqual(sync_counters(Recipe), 1)
+        recipe.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual((recipe.likes_count, recipe.saves_count), (1, 1))
+        self.assertEqual(untouched.updated_at, version)
+        self.assertEqual(sync_counters(Recipe), 0)
+
+    def test_sync_commands(self):
+        recipe = make_recipe(self.author, self.category)
+        LikedRecipe.objects.create(user=self.user, recipe=recipe)
+        out = io.StringIO()
+        call_command('sync_recipe_counters', stdout=out)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.likes_count, 1)
+
+
+class QueryPlanTests(CookscornerTestCase):
+    def add_relations(self, recipe, count):
+        ingredients = Ingredient.objects.bulk_create([Ingredient(name=f'{recipe.title} {i}') for i in range(count)])
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, quantity=1, unit_name='g') for ingredient in ingredients
+        ])
+        RecipeImage.objects.bulk_create([RecipeImage(recipe=recipe) for _ in range(count)])
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(context)
+
+    def test_list_queries_do_not_grow_with_the_page(self):
+        # Different authors and categories, so that any per-row lookup shows.
+        authors = User.objects.bulk_create([User(username=f'cook{i}', email=f'cook{i}@example.com') for i in range(50)])
+        categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(50)])
+        for i, (author, category) in enumerate(zip(authors, categories)):
+            self.add_relations(make_recipe(author, category, title=f'Soup {i}'), 2)
+        expected = self.count_queries('/cookscorner/recipes/?limit=1')
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = self.client.get('/cookscorner/recipes/?limit=50')
+        self.assertEqual(len(response.data['results']), 50)
+
+    def test_detail_queries_do_not_grow_with_the_relations(self):
+        small, large = make_recipe(self.author, self.category), make_recipe(self.user, self.category, title='Stew')
+        self.add_relations(small, 1)
+        self.add_relations(large, 50)
+        expected = self.count_queries(f'/cookscorner/recipes/{small.pk}/')
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = self.client.get(f'/cookscorner/recipes/{large.pk}/')
+        self.assertEqual((len(response.data['ingredients']), len(response.data['images'])), (50, 50))
+
+
+class CursorPaginationTests(CookscornerTestCase):
+    def test_recipe_cursor_next_previous(self):
+        recipes = [make_recipe(self.author, self.category, title=f'Recipe {i}') for i in range(5)]
+        first = self.client.get('/cookscorner/recipes/', {'pagination': 'cursor', 'limit': 2})
+        self.assertEqual([row['id'] for row in first.data['results']], [r.pk for r in recipes[:2]])
+        self.assertNotIn('count', first.data)
+        self.assertIsNone(first.data['previous'])
+
+        second = follow(self.client, first.data['next'])
+        self.assertEqual([row['id'] for row in second.data['results']], [r.pk for r in recipes[2:4]])
+        third = follow(self.client, second.data['next'])
+        self.assertEqual([row['id'] for row in third.data['results']], [recipes[4].pk])
+        self.assertIsNone(third.data['next'])
+
+        back = follow(self.client, third.data['previous'])
+        self.assertEqual([row['id'] for row in back.data['results']], [r.pk for r in recipes[2:4]])
+        back = follow(self.client, back.data['previous'])
+        self.assertEqual([row['id'] for row in back.data['results']], [r.pk for r in recipes[:2]])
+        self.assertIsNone(back.data['previous'])
+
+    def test_page_mode_by_default(self):
+        for i in range(3):
+            make_recipe(self.author, self.category, title=f'Recipe {i}')
+        response = self.client.get('/cookscorner/recipes/', {'limit': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['page'], 1)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/cookscorner/recipes/', {'cursor': 'garbage'}).status_code, 404)
+
+
+class SearchTests(CookscornerTestCase):
+    def create(self, title, description='Hot', ingredients=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = make_recipe(self.author, self.category, title=title)
+            recipe.description = description
+            recipe.save()
+            for name in ingredients:
+                ingredient, _ = Ingredient.objects.get_or_create(name=name)
+                RecipeIngredient.objects.create(recipe=recipe, ingredient=ingredient, quantity=1, unit_name='g')
+        return recipe
+
+    def search(self, query):
+        return [row['id'] for row in self.client.get('/cookscorner/recipes/search/', {'q': query}).data['results']]
+
+    def test_ranking(self):
+        in_ingredients = self.create('Stew', ingredients=['Tomato'])
+        in_title = self.create('Tomato soup')
+        in_description = self.create('Salad', description='Fresh tomato')
+        self.create('Borscht', ingredients=['Beet'])
+        self.assertEqual(self.search('tomato'), [in_title.pk, in_description.pk, in_ingredients.pk])
+        # Terms are prefixes and AND-ed; FTS5 syntax in the query is taken literally.
+        self.assertEqual(self.search('toma soup'), [in_title.pk])
+        self.assertEqual(self.search('tomato OR beet'), [])
+        self.assertEqual(self.search('  '), [])
+
+    def test_list_filter(self):
+        tomato = self.create('Tomato soup')
+        self.create('Borscht', ingredients=['Beet'])
+        response = self.client.get('/cookscorner/recipes/', {'search': 'beet'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Borscht'])
+        response = self.client.get('/cookscorner/recipes/', {'search': 'tomato'})
+        self.assertEqual([row['id'] for row in response.data['results']], [tomato.pk])
+
+    def test_ingredient_rows_reindexed(self):
+        recipe = self.create('Stew', ingredients=['Beet'])
+        row = recipe.recipe_ingredients.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=Ingredient.objects.create(name='Carrot'), quantity=1, unit_name='g',
+            )
+        self.assertEqual(self.search('carrot'), [recipe.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+        self.assertEqual(self.search('beet'), [])
+
+    def test_ingredient_rename_reindexed(self):
+        recipe = self.create('Stew', ingredients=['Beet'])
+        self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient = Ingredient.objects.get(name='Beet')
+            ingredient.name = 'Beetroot'
+            ingredient.save()
+        self.assertEqual(self.search('beetroot'), [recipe.pk])
+        response = self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['ingredients'][0]['name'], 'Beetroot')
+
+    def test_deleted_recipe_unindexed(self):
+        recipe = self.create('Tomato soup', ingredients=['Tomato'])
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertEqual(self.search('tomato'), [])
+
+
+class RecipeIngredientTests(CookscornerTestCase):
+    def payload(self, *ingredients):
+        return {
+            'title': 'Soup', 'author': self.user.pk, 'description': 'Hot', 'category': self.category.pk,
+            'cook_time': '10', 'difficulty': 'Easy',
+            'ingredients': [{'name': name, 'quantity': quantity, 'unit_name': 'g'} for name, quantity in ingredients],
+        }
+
+    def test_update_writes_only_the_difference(self):
+        serializer = RecipeSerializer(data=self.payload(('Salt', 5), ('Water', 500), ('Beet', 1)))
+        serializer.is_valid(raise_exception=True)
+        recipe = serializer.save(author=self.user)
+        rows = {row.ingredient.name: row.pk for row in recipe.recipe_ingredients.select_related('ingredient')}
+
+        serializer = RecipeSerializer(recipe, data=self.payload(('Salt', 5), ('Water', 750), ('Onion', 1)))
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        current = {
+            row.ingredient.name: (row.pk, row.quantity)
+            for row in RecipeIngredient.objects.filter(recipe=recipe).select_related('ingredient')
+        }
+        self.assertEqual(set(current), {'Salt', 'Water', 'Onion'})
+        self.assertEqual(current['Salt'], (rows['Salt'], 5))
+        self.assertEqual(current['Water'], (rows['Water'], 750))
+        # The catalog entry stays for other recipes.
+        self.assertTrue(Ingredient.objects.filter(name='Beet').exists())
+
+
+class IngredientCatalogTests(CookscornerTestCase):
+    def test_create(self):
+        response = self.client.post(
+            '/cookscorner/recipes/create/',
+            {
+                'title': 'Soup', 'author': self.user.pk, 'description': 'Hot', 'category': self.category.pk,
+                'cook_time': '10', 'difficulty': 'Easy',
+                'ingredients': [
+                    {'name': 'Salt', 'quantity': 5, 'unit_name': 'g'},
+                    {'name': 'Water', 'quantity': 500, 'unit_name': 'ml'},
+                    {'name': 'Salt', 'quantity': 7, 'unit_name': 'g'},
+                ],
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted((row['name'], row['quantity']) for row in response.data['ingredients']),
+                         [('Salt', 5), ('Water', 500)])
+        self.assertEqual(Ingredient.objects.count(), 2)
+
+    def test_names_match_without_case_and_whitespace(self):
+        salt = Ingredient.objects.create(name='Sea salt')
+        response = self.client.post(
+            '/cookscorner/recipes/create/',
+            {
+                'title': 'Soup', 'author': self.user.pk, 'description': 'Hot', 'category': self.category.pk,
+                'cook_time': '10', 'difficulty': 'Easy',
+                'ingredients': [
+                    {'name': ' sea   SALT ', 'quantity': 5, 'unit_name': 'g'},
+                    {'name': 'Black  pepper', 'quantity': 1, 'unit_name': 'g'},
+                    {'name': 'black pepper', 'quantity': 2, 'unit_name': 'g'},
+                ],
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        rows = {row['name']: (row['id'], row['quantity']) for row in response.data['ingredients']}
+        self.assertEqual(rows['Sea salt'], (salt.pk, 5))
+        self.assertEqual(rows['Black pepper'][1], 1)
+        self.assertEqual(sorted(Ingredient.objects.values_list('name', flat=True)), ['Black pepper', 'Sea salt'])
+
+
+class ProfileCounterTests(CookscornerTestCase):
+    def test_follow_views_keep_counters(self):
+        self.assertEqual(self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk}).status_code, 201)
+        self.author.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.author.followers_count, self.user.following_count), (1, 1))
+
+        self.assertEqual(self.client.delete(f'/cookscorner/follow-user/delete/{self.author.pk}/').status_code, 204)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+
+    def test_sync_command(self):
+        make_recipe(self.author, self.category)
+        call_command('sync_profile_counters', stdout=io.StringIO())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 1)
+
+
+class FeedTests(CookscornerTestCase):
+    def feed(self, **params):
+        return [row['id'] for row in self.client.get('/cookscorner/feed/', params).data['results']]
+
+    def test_fan_out(self):
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        recipe = make_recipe(self.author, self.category)
+        # Pulled until the worker pushes it.
+        self.assertEqual(self.feed(), [recipe.pk])
+
+        self.assertEqual(feed.fan_out_pending(), 1)
+        self.assertTrue(FeedEntry.objects.filter(user=self.user, recipe=recipe).exists())
+        recipe.refresh_from_db()
+        self.assertTrue(recipe.fanned_out)
+        self.assertEqual(self.feed(), [recipe.pk])
+        self.assertEqual(feed.fan_out_pending(), 0)
+
+    def test_follow_backfill_and_unfollow(self):
+        recipes = [make_recipe(self.author, self.category, title=f'Recipe {i}') for i in range(3)]
+        feed.fan_out_pending()
+        self.assertEqual(self.feed(), [])
+
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        self.assertEqual(self.feed(), [r.pk for r in reversed(recipes)])
+
+        self.client.delete(f'/cookscorner/follow-user/delete/{self.author.pk}/')
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_pulled_authors(self):
+        other = make_user('other')
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        self.client.force_authenticate(other)
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+
+        recipe = make_recipe(self.author, self.category)
+        self.assertEqual(feed.fan_out_pending(), 0)
+        self.assertFalse(FeedEntry.objects.filter(recipe=recipe).exists())
+        self.assertEqual(self.feed(), [recipe.pk])
+
+        # Back under the limit: the recipe is still pulled, then pushed by the next run.
+        self.client.delete(f'/cookscorner/follow-user/delete/{self.author.pk}/')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.feed(), [recipe.pk])
+        self.assertEqual(feed.fan_out_pending(), 1)
+        self.assertEqual(self.feed(), [recipe.pk])
+
+    def test_command(self):
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        make_recipe(self.author, self.category)
+        out = io.StringIO()
+        call_command('run_periodic_tasks', once=True, stdout=out)
+        self.assertIn('Fanned out 1 recipe(s).', out.getvalue())
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_cursor_pages(self):
+        big = make_user('big')
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        self.client.post('/cookscorner/follow-user/create/', {'followed': big.pk})
+        # Above the limit: big's recipes stay pulled.
+        User.objects.filter(pk=big.pk).update(followers_count=2)
+        recipes = [make_recipe(big if i % 2 else self.author, self.category, title=f'Recipe {i}') for i in range(5)]
+        feed.fan_out_pending()
+        expected = [r.pk for r in reversed(recipes)]
+
+        first = self.client.get('/cookscorner/feed/', {'limit': 2})
+        self.assertEqual([row['id'] for row in first.data['results']], expected[:2])
+        second = follow(self.client, first.data['next'])
+        self.assertEqual([row['id'] for row in second.data['results']], expected[2:4])
+        third = follow(self.client, second.data['next'])
+        self.assertEqual([row['id'] for row in third.data['results']], expected[4:])
+        self.assertIsNone(third.data['next'])
+        back = follow(self.client, third.data['previous'])
+        self.assertEqual([row['id'] for row in back.data['results']], expected[2:4])
+
+
+class ResponseCacheTests(CookscornerTestCase):
+    def test_namespace_versions(self):
+        before = get_versions(LIST_NAMESPACE, recipe_namespace(1))
+        bump_versions(LIST_NAMESPACE)
+        after = get_versions(LIST_NAMESPACE, recipe_namespace(1))
+        self.assertNotEqual(before[0], after[0])
+        self.assertEqual(before[1], after[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_recipes(1)
+        self.assertNotEqual(after, get_versions(LIST_NAMESPACE, recipe_namespace(1)))
+
+    def test_detail_invalidated_by_like(self):
+        recipe = make_recipe(self.author, self.category)
+        url = f'/cookscorner/recipes/{recipe.pk}/'
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['likes_count'], 1)
+        self.assertTrue(response.data['is_liked'])
+
+    def test_list_invalidated_by_save(self):
+        recipe = make_recipe(self.author, self.category)
+        self.client.get('/cookscorner/recipes/')
+        self.assertEqual(self.client.get('/cookscorner/recipes/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/cookscorner/save-recipes/create/', {'recipe': recipe.pk})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get('/cookscorner/recipes/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['saves_count'], 1)
+
+    def test_invalidated_by_update(self):
+        recipe = make_recipe(self.author, self.category)
+        self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        self.client.get('/cookscorner/recipes/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = 'Borscht'
+            recipe.save()
+
+        response = self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], 'Borscht')
+        self.assertEqual(self.client.get('/cookscorner/recipes/').data['results'][0]['title'], 'Borscht')
+
+    def test_author_rename_invalidates_recipes(self):
+        recipe = make_recipe(self.author, self.category)
+        self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.last_login = timezone.now()
+            self.author.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(f'/cookscorner/recipes/{recipe.pk}/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.username = 'chef'
+            self.author.save()
+        response = self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['author_name'], 'chef')
+
+    def test_viewers_do_not_share_entries(self):
+        recipe = make_recipe(self.author, self.category)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+        self.assertTrue(self.client.get(f'/cookscorner/recipes/{recipe.pk}/').data['is_liked'])
+
+        self.client.force_authenticate(self.author)
+        self.assertFalse(self.client.get(f'/cookscorner/recipes/{recipe.pk}/').data['is_liked'])
+
+
+class ConditionalGetTests(CookscornerTestCase):
+    def test_detail_round_trip(self):
+        recipe = make_recipe(self.author, self.category)
+        url = f'/cookscorner/recipes/{recipe.pk}/'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_round_trip(self):
+        recipe = make_recipe(self.author, self.category)
+        etag = self.client.get('/cookscorner/recipes/')['ETag']
+        self.assertEqual(self.client.get('/cookscorner/recipes/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.username = 'chef'
+            self.author.save()
+        self.assertEqual(self.client.get('/cookscorner/recipes/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        make_recipe(self.author, self.category, title='Stew')
+        etag = self.client.get('/cookscorner/recipes/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertEqual(self.client.get('/cookscorner/recipes/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_recipe(self):
+        self.assertEqual(self.client.get('/cookscorner/recipes/999/').status_code, 404)
+
+
+class ImageTestCase(CookscornerTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(IMAGE_WORKERS=0, IMAGE_STAGING_ROOT=os.path.join(root, 'staging'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # IMAGE_STORAGE is read once, when the models load.
+        self.storage = FileSystemStorage(location=os.path.join(root, 'media'))
+        for field in (RecipeImage._meta.get_field('image'), User._meta.get_field('photo')):
+            self.addCleanup(setattr, field, 'storage', field.storage)
+            field.storage = self.storage
+        self.recipe = make_recipe(self.user, self.category)
+
+    def upload(self, content, name='photo.jpg'):
+        return self.client.post('/cookscorner/recipes/create-image/', {
+            'recipe': self.recipe.pk, 'image': SimpleUploadedFile(name, content, 'image/jpeg'),
+        }, format='multipart')
+
+    def staged_files(self):
+        staging = images.get_staging_storage()
+        return staging.listdir('recipe_images')[1] if staging.exists('recipe_images') else []
+
+
+class ImageIngestionTests(ImageTestCase):
+    @override_settings(IMAGE_MAX_SIZE=1000)
+    def test_upload(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90°
+        exif[0x010f] = 'Camera'
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload(make_image(3000, 1500, exif=exif))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], RecipeImage.PENDING)
+        recipe_image = RecipeImage.objects.get(pk=response.data['id'])
+        self.assertEqual((recipe_image.status, recipe_image.image.name), (RecipeImage.PENDING, ''))
+        self.assertEqual(len(self.staged_files()), 1)
+
+        for callback in callbacks:
+            callback()
+        recipe_image.refresh_from_db()
+        self.assertEqual((recipe_image.status, recipe_image.staged_file), (RecipeImage.READY, ''))
+        self.assertEqual(self.staged_files(), [])
+        with Image.open(recipe_image.image.path) as image:
+            # Orientation applied, size bounded, metadata dropped.
+            self.assertEqual((image.format, image.size), ('JPEG', (500, 1000)))
+            self.assertEqual(dict(image.getexif()), {})
+
+    def test_rejected_image(self):
+        self.assertEqual(self.upload(b'not an image').status_code, 400)
+        self.assertEqual(self.staged_files(), [])
+
+        # Past the upload validation, a file that fails the full decode.
+        staged_name = images.stage_upload(SimpleUploadedFile('cut.jpg', make_image(400, 300)[:200]), 'recipe_images')
+        recipe_image = RecipeImage.objects.create(recipe=self.recipe, status=RecipeImage.PENDING, staged_file=staged_name)
+        with self.assertLogs('cooks_corner.images', 'WARNING'):
+            images.ingest_recipe_image(recipe_image.pk)
+        recipe_image.refresh_from_db()
+        self.assertEqual((recipe_image.status, recipe_image.image.name, recipe_image.staged_file), (RecipeImage.FAILED, '', ''))
+        self.assertEqual(self.staged_files(), [])
+
+    def test_process_pending_images(self):
+        # The queue was lost with the process: the callbacks never run.
+        with self.captureOnCommitCallbacks():
+            image_id = self.upload(make_image(400, 300)).data['id']
+            staged_photo = images.stage_upload(SimpleUploadedFile('me.png', make_image(64, 64, 'PNG')), 'user_photos')
+            User.objects.filter(pk=self.user.pk).update(staged_photo=staged_photo)
+
+        out = io.StringIO()
+        call_command('process_pending_images', stdout=out)
+        self.assertIn('Processed 1 pending image(s), 1 ready.', out.getvalue())
+        self.assertIn('Processed 1 pending profile photo(s).', out.getvalue())
+        self.assertEqual(RecipeImage.objects.get(pk=image_id).status, RecipeImage.READY)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.staged_photo, '')
+        self.assertTrue(self.user.photo.name.endswith('.jpg'))
+        self.assertFalse(images.get_staging_storage().exists(staged_photo))
+
+        # Nothing left to do the second time.
+        call_command('process_pending_images', stdout=out)
+        self.assertIn('Processed 0 pending image(s), 0 ready.', out.getvalue())
+
+
+class ImageVariantTests(ImageTestCase):
+    def create_image(self, width, height=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(make_image(width, height or width // 2))
+        return RecipeImage.objects.get(pk=response.data['id'])
+
+    def thumbnail(self):
+        return self.client.get('/cookscorner/recipes/').data['results'][0]['thumbnail']
+
+    def test_variants(self):
+        recipe_image = self.create_image(1200)
+        self.assertEqual(sorted(recipe_image.variants, key=int), ['160', '480', '1080'])
+        for width, formats in recipe_image.variants.items():
+            self.assertEqual(sorted(formats), ['jpeg', 'webp'])
+            for format, name in formats.items():
+                with Image.open(self.storage.path(name)) as image:
+                    self.assertEqual((image.format, image.size), (format.upper(), (int(width), int(width) // 2)))
+
+        data = self.client.get(f'/cookscorner/recipes/{self.recipe.pk}/').data['images'][0]
+        self.assertEqual(data['variants']['480']['webp'], f"http://testserver{self.storage.url(recipe_image.variants['480']['webp'])}")
+        self.assertEqual(data['srcset']['jpeg'].count('w, '), 2)
+        self.assertTrue(data['srcset']['webp'].endswith('1080w'))
+
+    def test_no_upscaling(self):
+        self.assertEqual(list(self.create_image(480).variants), ['160'])
+        self.assertEqual(self.create_image(100).variants, {})
+
+    def test_thumbnail(self):
+        # No variant at least IMAGE_THUMBNAIL_WIDTH wide: the original.
+        small = self.create_image(400)
+        self.assertTrue(self.thumbnail().endswith(small.image.url))
+
+        RecipeImage.objects.all().delete()
+        large = self.create_image(1200)
+        self.assertTrue(self.thumbnail().endswith(self.storage.url(large.variants['480']['jpeg'])))
+        with override_settings(IMAGE_THUMBNAIL_WIDTH=500):
+            cache.clear()
+            self.assertTrue(self.thumbnail().endswith(self.storage.url(large.variants['1080']['jpeg'])))
+
+    def test_generate_image_variants(self):
+        # Processed before variants existed.
+        recipe_image = RecipeImage(recipe=self.recipe)
+        recipe_image.image.save('old.jpg', ContentFile(make_image(600, 300)))
+        broken = RecipeImage(recipe=self.recipe)
+        broken.image.save('broken.jpg', ContentFile(b'not an image'))
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command('generate_image_variants', stdout=out, stderr=err)
+        self.assertIn('Generated variants for 1 image(s), 1 failed.', out.getvalue())
+        self.assertIn(f'Image {broken.pk}:', err.getvalue())
+        recipe_image.refresh_from_db()
+        self.assertEqual(sorted(recipe_image.variants, key=int), ['160', '480'])
+
+        call_command('generate_image_variants', stdout=out, stderr=err)
+        self.assertIn('Generated variants for 0 image(s), 1 failed.', out.getvalue())
+        call_command('generate_image_variants', '--all', stdout=out, stderr=err)
+        self.assertIn('Generated variants for 1 image(s), 1 failed.', out.getvalue().splitlines()[-1])
+
+
+class ViewerStateTests(CookscornerTestCase):
+    def test_flags(self):
+        liked, other = make_recipe(self.author, self.category), make_recipe(self.author, self.category, title='Stew')
+        self.client.post('/cookscorner/like-recipes/create/', {'recipe': liked.pk})
+        self.client.post('/cookscorner/save-recipes/create/', {'recipe': other.pk})
+        self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        rows = {row['id']: row for row in self.client.get('/cookscorner/recipes/').data['results']}
+        self.assertEqual(
+            [(row['is_liked'], row['is_saved'], row['author_followed']) for row in (rows[liked.pk], rows[other.pk])],
+            [(True, False, True), (False, True, True)],
+        )
+
+    def test_etag_not_shared_between_viewers(self):
+        recipe = make_recipe(self.author, self.category)
+        for url in (f'/cookscorner/recipes/{recipe.pk}/', '/cookscorner/recipes/'):
+            self.login(self.user)
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            self.login(self.author)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            self.client.credentials()
+            self.assertNotEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_follow_changes_etag(self):
+        recipe = make_recipe(self.author, self.category)
+        url = f'/cookscorner/recipes/{recipe.pk}/'
+        self.login(self.user)
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/cookscorner/follow-user/create/', {'followed': self.author.pk})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['author_followed'])
+
+    def test_no_user_query(self):
+        recipe = make_recipe(self.author, self.category)
+        url = f'/cookscorner/recipes/{recipe.pk}/'
+        self.login(self.user)
+        etag = self.client.get(url)['ETag']
+        # Answered from the response cache, for a viewer (and their stamp) from the user cache.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class BatchTests(CookscornerTestCase):
+    def test_outcomes(self):
+        kept, unliked, new = [make_recipe(self.author, self.category, title=f'Recipe {i}') for i in range(3)]
+        for recipe in (kept, unliked):
+            self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+
+        response = self.client.post(
+            '/cookscorner/like-recipes/batch/',
+            {'add': [kept.pk, new.pk, 999], 'remove': [unliked.pk, 998]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        outcomes = {(row['id'], row['action']): row['outcome'] for row in response.data['results']}
+        self.assertEqual(outcomes, {
+            (kept.pk, 'add'): 'exists',
+            (new.pk, 'add'): 'created',
+            (999, 'add'): 'not_found',
+            (unliked.pk, 'remove'): 'deleted',
+            (998, 'remove'): 'missing',
+        })
+
+        liked = LikedRecipe.objects.filter(user=self.user).values_list('recipe_id', flat=True)
+        self.assertEqual(sorted(liked), [kept.pk, new.pk])
+        counts = dict(Recipe.objects.values_list('pk', 'likes_count'))
+        self.assertEqual((counts[kept.pk], counts[unliked.pk], counts[new.pk]), (1, 0, 1))
+
+    def test_rejects_conflicting_ids(self):
+        response = self.client.post('/cookscorner/like-recipes/batch/', {'add': [1], 'remove': [1]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TrendingTests(TestCase):
+    def test_log_contributions_decay(self):
+        half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+        now = settings.TRENDING_EPOCH + 10 * half_life
+        contributions = trending.log_contributions(np.array([now, now - half_life]), 2.0)
+        self.assertAlmostEqual(math.exp(contributions[1] - contributions[0]), 0.5)
+
+    def test_aggregate(self):
+        recipe_ids, scores = trending.aggregate(np.array([2, 1, 2]), np.log(np.array([1.0, 2.0, 3.0])))
+        self.assertEqual(recipe_ids.tolist(), [1, 2])
+        np.testing.assert_allclose(np.exp(scores), [2.0, 4.0])
+
+    @override_settings(EVENT_SETTLE_SECONDS=0)
+    def test_update_scores(self):
+        author, user, other = make_user('author'), make_user('reader'), make_user('other')
+        category = Category.objects.create(name='Soups')
+        liked, saved = make_recipe(author, category), make_recipe(author, category, title='Stew')
+        LikedRecipe.objects.create(user=user, recipe=liked)
+        SavedRecipe.objects.create(user=user, recipe=saved)
+
+        self.assertEqual(trending.update_scores(), 2)
+        scores = dict(TrendingScore.objects.values_list('recipe_id', 'score'))
+        # A save weighs twice a like made at about the same time.
+        self.assertAlmostEqual(math.exp(scores[saved.pk] - scores[liked.pk]), 2.0, places=2)
+
+        # Only new events are added on the next run.
+        self.assertEqual(trending.update_scores(), 0)
+        LikedRecipe.objects.create(user=other, recipe=liked)
+        self.assertEqual(trending.update_scores(), 1)
+        score = TrendingScore.objects.get(recipe=liked).score
+        self.assertAlmostEqual(math.exp(score - scores[liked.pk]), 2.0, places=2)
+
+        self.assertEqual(trending.rebuild_scores(), 3)
+        self.assertAlmostEqual(TrendingScore.objects.get(recipe=liked).score, score, places=2)
+
+    @override_settings(EVENT_SETTLE_SECONDS=60)
+    def test_recent_events_wait(self):
+        category = Category.objects.create(name='Soups')
+        recipe = make_recipe(make_user('author'), category)
+        users = [make_user(f'user{i}') for i in range(3)]
+        likes = [LikedRecipe.objects.create(user=user, recipe=recipe) for user in users]
+        old = timezone.now() - timedelta(minutes=5)
+        # The second one is recent: its transaction may not be the last one with a lower id to commit.
+        LikedRecipe.objects.filter(pk__in=[likes[0].pk, likes[2].pk]).update(liked_on=old)
+
+        self.assertEqual(trending.update_scores(), 1)
+        self.assertEqual(EventCheckpoint.objects.get(source='trending:likes').last_id, likes[0].pk)
+        LikedRecipe.objects.filter(pk=likes[1].pk).update(liked_on=old)
+        self.assertEqual(trending.update_scores(), 2)
+
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        self.users = [make_user(f'user{i}') for i in range(3)]
+        category = Category.objects.create(name='Soups')
+        self.recipes = [make_recipe(self.users[0], category, title=f'Recipe {i}') for i in range(3)]
+
+    def like(self, user, *recipes):
+        for recipe in recipes:
+            LikedRecipe.objects.create(user=user, recipe=recipe)
+
+    def get_scores(self, recipe):
+        return dict(RecipeSimilarity.objects.filter(recipe=recipe).values_list('similar_id', 'score'))
+
+    def test_cosine_scores(self):
+        a, b, c = self.recipes
+        self.like(self.users[0], a, b)
+        self.like(self.users[1], a, b)
+        self.like(self.users[2], a, c)
+        sync_counters(Recipe)
+
+        similarity.rebuild_similarities()
+        # co-occurrences / sqrt(popularity * popularity): a was liked 3 times, b twice, c once.
+        scores = self.get_scores(a)
+        self.assertAlmostEqual(scores[b.pk], 2 / math.sqrt(3 * 2))
+        self.assertAlmostEqual(scores[c.pk], 1 / math.sqrt(3 * 1))
+        self.assertEqual(set(self.get_scores(c)), {a.pk})
+
+    @override_settings(SIMILAR_RECIPES_COUNT=1)
+    def test_top_neighbours(self):
+        a, b, c = self.recipes
+        self.like(self.users[0], a, b, c)
+        self.like(self.users[1], a, b)
+        sync_counters(Recipe)
+
+        similarity.rebuild_similarities()
+        self.assertEqual(set(self.get_scores(a)), {b.pk})
+
+    @override_settings(EVENT_SETTLE_SECONDS=0)
+    def test_update_similarities(self):
+        a, b, c = self.recipes
+        self.like(self.users[0], a, b)
+        similarity.rebuild_similarities()
+        self.assertEqual(similarity.update_similarities(), 0)
+
+        # Only the recipes of users with new likes are recomputed.
+        self.like(self.users[1], b, c)
+        self.assertEqual(similarity.update_similarities(), 2)
+        self.assertEqual(set(self.get_scores(b)), {a.pk, c.pk})
+
+    @override_settings(EVENT_SETTLE_SECONDS=60)
+    def test_recent_events_wait(self):
+        a, b, c = self.recipes
+        self.like(self.users[0], a, b)
+        self.like(self.users[1], a, c)
+        old = timezone.now() - timedelta(minutes=5)
+        LikedRecipe.objects.filter(user=self.users[0]).update(liked_on=old)
+
+        similarity.rebuild_similarities()
+        # Every visible like is counted, but the checkpoint stays before the recent ones.
+        self.assertEqual(set(self.get_scores(a)), {b.pk, c.pk})
+        self.assertEqual(similarity.update_similarities(), 0)
+        LikedRecipe.objects.filter(user=self.users[1]).update(liked_on=old)
+        self.assertEqual(similarity.update_similarities(), 2)
+
+
+class RecipeFinderTests(CookscornerTestCase):
+    def create(self, title, *ingredients):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/cookscorner/recipes/create/', {
+                'title': title, 'author': self.author.pk, 'description': 'Hot', 'category': self.category.pk,
+                'cook_time': '10', 'difficulty': 'Easy',
+                'ingredients': [{'name': name, 'quantity': 1, 'unit_name': 'g'} for name in ingredients],
+            }, format='json')
+        return response.data['id']
+
+    def find(self, names):
+        response = self.client.get('/cookscorner/recipes/by-ingredients/', {'ingredients': names})
+        return [(row['id'], row['matched_ingredients'], row['missing_ingredients']) for row in response.data['results']]
+
+    def test_ranking(self):
+        partial = self.create('Soup', 'Tomato')
+        complete = self.create('Salad', 'Tomato', 'Onion')
+        more = self.create('Stew', 'Tomato', 'Onion', 'Garlic', 'Salt')
+        self.create('Borscht', 'Beet')
+        # Most matched first, then fewest missing; names are compared case-insensitively.
+        self.assertEqual(self.find('tomato, ONION'), [(complete, 2, 0), (more, 2, 2), (partial, 1, 0)])
+        self.assertEqual(self.find('caviar'), [])
+        self.assertEqual(self.find(''), [])
+
+    def test_writes_update_the_index(self):
+        stew = self.create('Stew', 'Beet')
+        self.assertEqual(self.find('beet'), [(stew, 1, 0)])
+
+        soup = self.create('Soup', 'Beet', 'Carrot')
+        self.assertEqual(self.find('beet'), [(stew, 1, 0), (soup, 1, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient = Ingredient.objects.get(name='Beet')
+            ingredient.name = 'Beetroot'
+            ingredient.save()
+        self.assertEqual(self.find('beet'), [])
+        self.assertEqual(self.find('beetroot'), [(stew, 1, 0), (soup, 1, 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.get(pk=stew).delete()
+        self.assertEqual(self.find('beetroot'), [(soup, 1, 1)])
+
+    def test_refresh_reads_other_processes(self):
+        self.create('Stew', 'Beet')
+        self.find('beet')
+        # Written by another process: no signal here, only the recipe's row version changes.
+        recipe = make_recipe(self.author, self.category)
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=Ingredient.objects.create(name='Carrot'), quantity=1, unit_name='g'),
+        ])
+        self.assertEqual(self.find('carrot'), [])
+        ingredient_index.index.checked_at = 0
+        self.assertEqual(self.find('carrot'), [(recipe.pk, 1, 0)])
+
+    def test_searches_do_not_wait_for_a_refresh(self):
+        stew = self.create('Stew', 'Beet')
+        self.find('beet')
+        ingredient_index.index.checked_at = 0
+        # Another request is refreshing: this one searches the current state instead of waiting.
+        with ingredient_index.index.refresh_lock:
+            self.assertEqual(self.find('beet'), [(stew, 1, 0)])
+        self.assertEqual(ingredient_index.index.checked_at, 0)
+
+
+class AsyncParityTests(CookscornerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.login(self.user)
+        self.recipes = [make_recipe(self.author, self.category, title=f'Soup {i}') for i in range(3)]
+        self.token = self.client._credentials['HTTP_AUTHORIZATION']
+
+    def arequest(self, method, path, authenticated=True):
+        # async_to_sync keeps the views' thread-sensitive ORM calls on this thread and its test transaction.
+        headers = {'Authorization': self.token} if authenticated else {}
+        return async_to_sync(getattr(AsyncClient(), method))(path, headers=headers)
+
+    def test_list_and_detail(self):
+        self.client.post('/cookscorner/like-recipes/create/', {'recipe': self.recipes[1].pk})
+        for query in ('?limit=2', '?limit=2&page=2', '?pagination=cursor&limit=2', f'?author_id={self.author.pk}'):
+            sync, response = self.client.get(f'/cookscorner/recipes/{query}').json(), self.arequest('get', f'/cookscorner/async/recipes/{query}')
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data['results'], sync['results'])
+            self.assertEqual(data.keys(), sync.keys())
+            self.assertEqual(data['next'] is None, sync['next'] is None)
+
+        sync = self.client.get(f'/cookscorner/recipes/{self.recipes[1].pk}/')
+        response = self.arequest('get', f'/cookscorner/async/recipes/{self.recipes[1].pk}/')
+        self.assertEqual(response.json(), sync.json())
+        self.assertTrue(response.json()['is_liked'])
+
+        self.assertEqual(self.arequest('get', '/cookscorner/async/recipes/0/').status_code, 404)
+        self.assertEqual(self.arequest('get', '/cookscorner/async/recipes/?page=99').status_code, 404)
+        self.assertEqual(self.client.get('/cookscorner/recipes/?page=99').status_code, 404)
+
+    def test_relations(self):
+        cases = (
+            ('like-recipes', 'recipe', self.recipes[0].pk, self.recipes[1].pk),
+            ('save-recipes', 'recipe', self.recipes[0].pk, self.recipes[1].pk),
+            ('follow-user', 'followed', self.author.pk, make_user('cook').pk),
+        )
+        for prefix, field, sync_target, async_target in cases:
+            with self.subTest(prefix):
+                sync = [
+                    self.client.post(f'/cookscorner/{prefix}/create/', {field: sync_target}),
+                    self.client.post(f'/cookscorner/{prefix}/create/', {field: sync_target}),
+                    self.client.delete(f'/cookscorner/{prefix}/delete/{sync_target}/'),
+                    self.client.delete(f'/cookscorner/{prefix}/delete/{sync_target}/'),
+                ]
+                url = f'/cookscorner/async/{prefix}/{async_target}/'
+                responses = [self.arequest('post', url), self.arequest('post', url), self.arequest('delete', url), self.arequest('delete', url)]
+                self.assertEqual([r.status_code for r in responses], [r.status_code for r in sync])
+                self.assertEqual([201, 400, 204, 404], [r.status_code for r in responses])
+                self.assertEqual(responses[0].json()[field], async_target)
+                self.assertEqual(responses[1].json(), sync[1].json())
+                self.assertEqual(responses[3].json(), sync[3].json())
+
+                # The target is part of the async URL: a missing one is 404, where the sync body field is a 400.
+                self.assertEqual(self.arequest('post', f'/cookscorner/async/{prefix}/0/').status_code, 404)
+                self.assertEqual(self.client.post(f'/cookscorner/{prefix}/create/', {field: 0}).status_code, 400)
+
+        self.recipes[0].refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual((self.recipes[0].likes_count, self.recipes[0].saves_count, self.author.followers_count), (0, 0, 0))
+
+    def test_authentication_required(self):
+        url = f'/cookscorner/async/like-recipes/{self.recipes[0].pk}/'
+        for method, path in (('get', '/cookscorner/async/recipes/'), ('post', url), ('delete', url)):
+            response = self.arequest(method, path, authenticated=False)
+            self.assertEqual(response.status_code, 401)
+            self.assertIn('WWW-Authenticate', response)
+        self.assertEqual(self.arequest('put', url).status_code, 405)
+
+        # Recipe details are public on both.
+        detail = self.arequest('get', f'/cookscorner/async/recipes/{self.recipes[0].pk}/', authenticated=False)
+        self.assertEqual(detail.status_code, 200)
+        self.assertFalse(detail.json()['is_liked'])
+
+        self.client.credentials()
+        self.assertEqual(self.client.get('/cookscorner/recipes/').status_code, 401)
+        self.assertEqual(self.client.post('/cookscorner/like-recipes/create/', {'recipe': self.recipes[0].pk}).status_code, 401)
+        self.assertEqual(self.client.get(f'/cookscorner/recipes/{self.recipes[0].pk}/').json(), detail.json())
+
+
+class MetricsTests(CookscornerTestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_server_timing(self):
+        recipe = make_recipe(self.author, self.category)
+        requests = self.sample('cookscorner_http_requests_total', view='recipe-detail', method='GET', status='200')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        db, app = response['Server-Timing'].split(', ')
+        self.assertRegex(db, r'^db;dur=[\d.]+;desc="\d+ queries"$')
+        self.assertEqual(db.split('"')[1], f'{len(context)} queries')
+        self.assertRegex(app, r'^app;dur=[\d.]+$')
+        self.assertEqual(
+            self.sample('cookscorner_http_requests_total', view='recipe-detail', method='GET', status='200'), requests + 1
+        )
+
+        # Answered from the response cache, with no viewer flags to read.
+        self.client.force_authenticate(None)
+        self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        buckets = self.sample('cookscorner_db_queries_per_request_bucket', view='recipe-detail', le='1.0')
+        response = self.client.get(f'/cookscorner/recipes/{recipe.pk}/')
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+        self.assertEqual(self.sample('cookscorner_db_queries_per_request_bucket', view='recipe-detail', le='1.0'), buckets + 1)
+
+    def test_query_recorder(self):
+        self.assertIn(metrics.record_query, connection.execute_wrappers)
+        stats = metrics.QueryStats()
+        token = metrics.current_stats.set(stats)
+        try:
+            list(Recipe.objects.all())
+            Recipe.objects.count()
+        finally:
+            metrics.current_stats.reset(token)
+        self.assertEqual(stats.count, 2)
+        self.assertGreater(stats.duration, 0)
+        # Outside a request, nothing is recorded.
+        Recipe.objects.count()
+        self.assertEqual(stats.count, 2)
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.get('/cookscorner/metrics/').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/cookscorner/metrics/').status_code, 401)
+        self.client.force_authenticate(make_user('admin', is_staff=True))
+        response = self.client.get('/cookscorner/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'cookscorner_http_request_duration_seconds_bucket{', response.content)
+
+
+class ProfilingTests(CookscornerTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(PROFILING_ROOT=root, PROFILING_SAMPLE_RATE=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        profiling.budget = profiling.SamplingBudget()
+        self.staff = make_user('admin', is_staff=True)
+        self.recipe = make_recipe(self.author, self.category)
+
+    def stored(self):
+        return [row['name'] for row in self.client.get('/cookscorner/profiles/').data['results']]
+
+    def test_requested_mode(self):
+        factory = RequestFactory()
+        self.assertIsNone(profiling.get_requested_mode(factory.get('/')))
+        self.assertEqual(profiling.get_requested_mode(factory.get('/', HTTP_X_PROFILE=' CProfile ')), 'cprofile')
+        self.assertEqual(profiling.get_requested_mode(factory.get('/', {'profile': 'sample'})), 'sample')
+        with self.assertRaises(ValueError):
+            profiling.get_requested_mode(factory.get('/', {'profile': 'trace'}))
+
+    def test_staff_profiles(self):
+        self.login(self.staff)
+        for mode, extension in (('cprofile', '.prof'), ('sample', '.collapsed')):
+            response = self.client.get(f'/cookscorner/recipes/{self.recipe.pk}/', {'profile': mode})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['X-Profile-Id'].endswith(extension))
+            self.assertIn(response['X-Profile-Id'], self.stored())
+
+            download = self.client.get(f"/cookscorner/profiles/{response['X-Profile-Id']}/")
+            self.assertEqual(download.status_code, 200)
+            self.assertIn(response['X-Profile-Id'], download['Content-Disposition'])
+
+        self.assertEqual(self.client.get('/cookscorner/recipes/', HTTP_X_PROFILE='trace').status_code, 400)
+        self.assertEqual(self.client.get('/cookscorner/profiles/missing.prof/').status_code, 404)
+
+    def test_other_users_are_not_profiled(self):
+        self.login(self.user)
+        for mode in ('cprofile', 'trace'):
+            response = self.client.get(f'/cookscorner/recipes/{self.recipe.pk}/', {'profile': mode})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.client.get('/cookscorner/profiles/').status_code, 403)
+        self.login(self.staff)
+        self.assertEqual(self.stored(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_SHARE=0.5)
+    def test_sampling_budget(self):
+        self.login(self.user)
+        response = self.client.get(f'/cookscorner/recipes/{self.recipe.pk}/')
+        # Sampled profiles are stored for admins, not announced to the caller.
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertGreater(profiling.budget.spent, 0)
+
+        profiling.budget.charge(3600)
+        self.assertFalse(profiling.budget.draw())
+        self.client.get(f'/cookscorner/recipes/{self.recipe.pk}/')
+        self.login(self.staff)
+        stored = self.stored()
+        self.assertEqual(len(stored), 1)
+        self.assertTrue(stored[0].endswith('.collapsed'))
+
+        with override_settings(PROFILING_SAMPLE_RATE=0):
+            self.assertFalse(profiling.SamplingBudget().draw())
+
+
+class SchemaTests(CookscornerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.set_code_version('v1')
+
+    def set_code_version(self, version):
+        # Both the version and the artifacts are kept for the life of the process.
+        settings_override = override_settings(SCHEMA_ROOT=self.root, SCHEMA_CODE_VERSION=version)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for state in (schema.get_code_version.cache_clear, schema.artifacts.clear):
+            state()
+            self.addCleanup(state)
+
+    def test_spec_views(self):
+        response = self.client.get('/cookscorner/swagger.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"v1-json"')
+        self.assertIn('/recipes/{id}/', json.loads(response.content)['paths'])
+        self.assertEqual(sorted(os.listdir(self.root)), ['openapi-v1.json', 'openapi-v1.yaml'])
+
+        self.assertEqual(self.client.get('/cookscorner/swagger.json', HTTP_IF_NONE_MATCH='"v1-json"').status_code, 304)
+        response = self.client.get('/cookscorner/swagger.yaml', HTTP_IF_NONE_MATCH='"v1-json"')
+        self.assertEqual((response.status_code, response['ETag']), (200, '"v1-yaml"'))
+        self.assertTrue(response['Content-Type'].startswith('application/yaml'))
+        response = self.client.get('/cookscorner/swagger/', {'format': 'openapi'})
+        self.assertEqual((response.status_code, response['ETag']), (200, '"v1-json"'))
+
+    # The manifest only exists after collectstatic.
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_ui_does_not_generate(self):
+        response = self.client.get('/cookscorner/swagger/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_code_version(self):
+        # Artifacts of another code version are neither served nor revalidated.
+        with open(os.path.join(self.root, 'openapi-v2.json'), 'wb') as file:
+            file.write(b'{"paths": {"/stale/": {}}}')
+        self.client.get('/cookscorner/swagger.json')
+        self.set_code_version('v2')
+        response = self.client.get('/cookscorner/swagger.json', HTTP_IF_NONE_MATCH='"v1-json"')
+        self.assertEqual((response.status_code, response['ETag']), (200, '"v2-json"'))
+        self.assertEqual(json.loads(response.content)['paths'], {'/stale/': {}})
+
+        # Without SCHEMA_CODE_VERSION: a hash of the sources and package versions.
+        self.set_code_version('')
+        version = schema.get_code_version()
+        self.assertRegex(version, r'^[0-9a-f]{12}$')
+        schema.get_code_version.cache_clear()
+        self.assertEqual(schema.get_code_version(), version)
+
+    def test_generate_schema(self):
+        for name in ('openapi-v0.json', 'openapi-v0.yaml', 'notes.txt'):
+            open(os.path.join(self.root, name), 'w').close()
+        out = io.StringIO()
+        call_command('generate_schema', stdout=out)
+        self.assertIn(f'Schema v1 written to {self.root}.', out.getvalue())
+        self.assertEqual(len(os.listdir(self.root)), 5)
+
+        call_command('generate_schema', '--clean', stdout=out)
+        self.assertEqual(sorted(os.listdir(self.root)), ['notes.txt', 'openapi-v1.json', 'openapi-v1.yaml'])
+        with open(os.path.join(self.root, 'openapi-v1.json'), 'rb') as file:
+            self.assertEqual(self.client.get('/cookscorner/swagger.json').content, file.read())
+
+
+class RelationListTests(CookscornerTestCase):
+    def test_liked_recipes_newest_first(self):
+        recipes = [make_recipe(self.author, self.category, title=f'Recipe {i}') for i in range(3)]
+        for recipe in recipes:
+            self.client.post('/cookscorner/like-recipes/create/', {'recipe': recipe.pk})
+        LikedRecipe.objects.create(user=self.author, recipe=recipes[0])
+
+        first = self.client.get('/cookscorner/like-recipes/', {'limit': 2})
+        self.assertEqual([row['recipe'] for row in first.data['results']], [recipes[2].pk, recipes[1].pk])
+        second = follow(self.client, first.data['next'])
+        self.assertEqual([row['recipe'] for row in second.data['results']], [recipes[0].pk])
+        self.assertIsNone(second.data['next'])
+        back = follow(self.client, second.data['previous'])
+        self.assertEqual([row['recipe'] for row in back.data['results']], [recipes[2].pk, recipes[1].pk])
+
+
+class ExportTests(CookscornerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = make_user('admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.recipe = make_recipe(self.author, self.category)
+        LikedRecipe.objects.create(user=self.user, recipe=self.recipe)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response = self.client.get('/cookscorner/export/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.recipe.pk])
+        self.assertEqual(rows[0]['ingredients'], [])
+
+    def test_csv(self):
+        response = self.client.get('/cookscorner/export/likes/', {'output': 'csv'})
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(rows[0], ['id', 'user_id', 'recipe_id', 'liked_on'])
+        self.assertEqual(rows[1][1:3], [str(self.user.pk), str(self.recipe.pk)])
+
+    def test_incremental(self):
+        until = self.client.get('/cookscorner/export/likes/')['X-Export-Until']
+        self.assertEqual(self.read(self.client.get('/cookscorner/export/likes/', {'since': until})), '')
+        LikedRecipe.objects.create(user=self.author, recipe=self.recipe)
+        rows = self.read(self.client.get('/cookscorner/export/likes/', {'since': until})).splitlines()
+        self.assertEqual([json.loads(row)['user_id'] for row in rows], [self.author.pk])
+
+    def test_chunks(self):
+        fans = User.objects.bulk_create([User(username=f'fan{i}', email=f'fan{i}@example.com') for i in range(150)])
+        LikedRecipe.objects.bulk_create([LikedRecipe(user=fan, recipe=self.recipe) for fan in fans])
+        chunks = list(stream('likes', 'ndjson'))
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [100, 51])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/cookscorner/export/users/').status_code, 404)
+        self.assertEqual(self.client.get('/cookscorner/export/likes/', {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/cookscorner/export/likes/', {'since': 'yesterday'}).status_code, 400)
+        with self.assertRaises(ValueError):
+            parse_since('yesterday')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/cookscorner/export/likes/').status_code, 403)
@@ -0,0 +1,103 @@
+import math
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from cooks_corner.models import LikedRecipe, SavedRecipe, EventCheckpoint, TrendingScore
+
+
+# checkpoint source -> (event model, event timestamp field); weights come from TRENDING_WEIGHTS
+SOURCES = {
+    'likes': (LikedRecipe, 'liked_on'),
+    'saves': (SavedRecipe, 'saved_on'),
+}
+
+
+def get_decay_rate():
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def log_contributions(timestamps, weight):
+    """
+    Forward decay: an event at `t` adds `weight * exp(rate * (t - epoch))` to its recipe's score.
+
+    All scores share the factor `exp(-rate * (now - epoch))`, so ordering by them is ordering by the
+    decayed score at any instant, and new events are simply added. Scores are kept in log space,
+    where they cannot overflow however far from the epoch the events are.
+    """
+    return math.log(weight) + get_decay_rate() * (timestamps - settings.TRENDING_EPOCH)
+
+
+def aggregate(recipe_ids, contributions):
+    # Group the log contributions by recipe: sort, then one logaddexp reduction per run of equal ids.
+    order = np.argsort(recipe_ids, kind='stable')
+    recipe_ids, contributions = recipe_ids[order], contributions[order]
+    unique_ids, starts = np.unique(recipe_ids, return_index=True)
+    return unique_ids, np.logaddexp.reduceat(contributions, starts)
+
+
+def merge_scores(recipe_ids, scores):
+    recipe_ids = recipe_ids.tolist()
+    existing = dict(TrendingScore.objects.filter(recipe_id__in=recipe_ids).values_list('recipe_id', 'score'))
+    current = np.array([existing.get(recipe_id, -np.inf) for recipe_id in recipe_ids])
+    merged = np.logaddexp(current, scores)
+    TrendingScore.objects.bulk_create(
+        [TrendingScore(recipe_id=recipe_id, score=score) for recipe_id, score in zip(recipe_ids, merged.tolist())],
+        update_conflicts=True,
+        unique_fields=['recipe'],
+        update_fields=['score'],
+    )
+
+
+def get_settled_events(model, timestamp_field, last_id):
+    """
+    The events after `last_id` up to the first one created less than EVENT_SETTLE_SECONDS ago.
+
+    Ids are allocated at insert, not at commit: a checkpoint moved past an id whose transaction was
+    still open would skip that event for good. Holding back the recent events, and everything after
+    them, keeps the checkpoint behind any transaction shorter than EVENT_SETTLE_SECONDS.
+    """
+    events = model.objects.filter(pk__gt=last_id)
+    cutoff = timezone.now() - timedelta(seconds=settings.EVENT_SETTLE_SECONDS)
+    unsettled = events.filter(**{f'{timestamp_field}__gt': cutoff}).order_by('pk').values_list('pk', flat=True).first()
+    return events if unsettled is None else events.filter(pk__lt=unsettled)
+
+
+def update_scores(chunk_size=10000):
+    """
+    Add the likes and saves created since the last run to the trending scores, once settled
+    (see get_settled_events). Returns the number of events processed.
+
+    Removed likes and saves are not subtracted, and events of transactions that outlasted
+    EVENT_SETTLE_SECONDS are missed: `rebuild_scores` (scheduled in PERIODIC_TASKS) recovers both.
+    """
+    processed = 0
+    for source, (model, timestamp_field) in SOURCES.items():
+        weight = settings.TRENDING_WEIGHTS[source]
+        while True:
+            with transaction.atomic():
+                checkpoint, _ = EventCheckpoint.objects.select_for_update().get_or_create(source=f'trending:{source}')
+                rows = list(
+                    get_settled_events(model, timestamp_field, checkpoint.last_id)
+                    .order_by('pk')
+                    .values_list('pk', 'recipe_id', timestamp_field)[:chunk_size]
+                )
+                if not rows:
+                    break
+                event_ids, recipe_ids, times = zip(*rows)
+                timestamps = np.array([time.timestamp() for time in times])
+                merge_scores(*aggregate(np.array(recipe_ids), log_contributions(timestamps, weight)))
+                checkpoint.last_id = event_ids[-1]
+                checkpoint.save(update_fields=['last_id'])
+            processed += len(rows)
+    return processed
+
+
+def rebuild_scores(chunk_size=10000):
+    # One transaction, so readers keep seeing the previous ranking until the new one is complete.
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        EventCheckpoint.objects.filter(source__startswith='trending:').delete()
+        return update_scores(chunk_size)
+
@@ -1,27 +1,51 @@
 from django.urls import path
-from cooks_corner.views.recipes_view import CategoryList, RecipeCreateView, RecipeListView, RecipeDetailView, RecipeImageCreateView
-from cooks_corner.views.follow_view import FollowListView, FollowCreateView, FollowDestroyView
-from cooks_corner.views.like_view import LikedRecipeListView, LikedRecipeCreateView, LikedRecipeDestroyView
-from cooks_corner.views.save_view import SavedRecipeListView, SavedRecipeCreateView, SavedRecipeDestroyView
+from cooks_corner.views.recipes_view import CategoryList, RecipeCreateView, RecipeListView, RecipeSearchView, TrendingRecipeListView, SimilarRecipeListView, RecipeByIngredientsView, RecipeDetailView, RecipeImageCreateView
+from cooks_corner.views.follow_view import FollowListView, FollowCreateView, FollowDestroyView, FollowBatchView
+from cooks_corner.views.like_view import LikedRecipeListView, LikedRecipeCreateView, LikedRecipeDestroyView, LikedRecipeBatchView
+from cooks_corner.views.save_view import SavedRecipeListView, SavedRecipeCreateView, SavedRecipeDestroyView, SavedRecipeBatchView
+from cooks_corner.views.feed_view import FeedView
+from cooks_corner.views.metrics_view import MetricsView
+from cooks_corner.views.profiling_view import ProfileListView, ProfileDownloadView
+from cooks_corner.views.export_view import ExportView
+from cooks_corner.views import async_view
 
 
 urlpatterns = [
     path('categories/', CategoryList.as_view(), name='category-list'),
     # 
     path('recipes/', RecipeListView.as_view(), name='recipes-list'),
+    path('recipes/search/', RecipeSearchView.as_view(), name='recipes-search'),
+    path('recipes/trending/', TrendingRecipeListView.as_view(), name='recipes-trending'),
+    path('recipes/by-ingredients/', RecipeByIngredientsView.as_view(), name='recipes-by-ingredients'),
     path('recipes/create/', RecipeCreateView.as_view(), name='recipe-create'),
     path('recipes/<int:pk>/', RecipeDetailView.as_view(), name='recipe-detail'),
+    path('recipes/<int:pk>/similar/', SimilarRecipeListView.as_view(), name='recipe-similar'),
     path('recipes/create-image/', RecipeImageCreateView.as_view(), name='create-image'),
     #
     path('like-recipes/', LikedRecipeListView.as_view(), name='liked-recipe-list'),
     path('like-recipes/create/', LikedRecipeCreateView.as_view(), name='liked-recipe-create'),
     path('like-recipes/delete/<int:recipe_id>/', LikedRecipeDestroyView.as_view(), name='liked-recipe-delete'),
+    path('like-recipes/batch/', LikedRecipeBatchView.as_view(), name='liked-recipe-batch'),
     # 
-    path('save-recipes/', SavedRecipeListView.as_view(), name='liked-recipe-list'),
-    path('save-recipes/create/', SavedRecipeCreateView.as_view(), name='liked-recipe-create'),
-    path('save-recipes/delete/<int:recipe_id>/', SavedRecipeDestroyView.as_view(), name='liked-recipe-delete'),
+    path('save-recipes/', SavedRecipeListView.as_view(), name='saved-recipe-list'),
+    path('save-recipes/create/', SavedRecipeCreateView.as_view(), name='saved-recipe-create'),
+    path('save-recipes/delete/<int:recipe_id>/', SavedRecipeDestroyView.as_view(), name='saved-recipe-delete'),
+    path('save-recipes/batch/', SavedRecipeBatchView.as_view(), name='saved-recipe-batch'),
     # 
     path('follow-user/', FollowListView.as_view(), name='follow-user-list'),
     path('follow-user/create/', FollowCreateView.as_view(), name='follow-user-create'),
     path('follow-user/delete/<int:followed_id>/', FollowDestroyView.as_view(), name='follow-user-delete'),
+    path('follow-user/batch/', FollowBatchView.as_view(), name='follow-user-batch'),
+    #
+    path('feed/', FeedView.as_view(), name='feed'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('profiles/', ProfileListView.as_view(), name='request-profile-list'),
+    path('profiles/<str:name>/', ProfileDownloadView.as_view(), name='request-profile-download'),
+    path('export/<str:dataset>/', ExportView.as_view(), name='export'),
+    # async (ASGI) variants
+    path('async/recipes/', async_view.recipe_list, name='async-recipes-list'),
+    path('async/recipes/<int:pk>/', async_view.recipe_detail, name='async-recipe-detail'),
+    path('async/like-recipes/<int:target_id>/', async_view.like_recipe, name='async-liked-recipe'),
+    path('async/save-recipes/<int:target_id>/', async_view.save_recipe, name='async-saved-recipe'),
+    path('async/follow-user/<int:target_id>/', async_view.follow_user, name='async-follow-user'),
 ]
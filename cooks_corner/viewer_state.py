@@ -0,0 +1,102 @@
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from authentication.authentication import get_version
+from cooks_corner.models import Follow, LikedRecipe, SavedRecipe
+
+
+def get_viewer_state(user, recipe_ids, author_ids):
+    """
+    Return the ids of the recipes the user liked and saved and of the authors they follow,
+    among the given ones: one IN query per relation, whatever the number of recipes.
+    """
+    if not user.is_authenticated or not recipe_ids:
+        return set(), set(), set()
+    liked = LikedRecipe.objects.filter(user=user, recipe_id__in=recipe_ids).values_list('recipe_id', flat=True)
+    saved = SavedRecipe.objects.filter(user=user, recipe_id__in=recipe_ids).values_list('recipe_id', flat=True)
+    followed = Follow.objects.filter(follower=user, followed_id__in=author_ids).values_list('followed_id', flat=True)
+    return set(liked), set(saved), set(followed)
+
+
+async def aget_viewer_state(user, recipe_ids, author_ids):
+    if not user.is_authenticated or not recipe_ids:
+        return set(), set(), set()
+    liked = LikedRecipe.objects.filter(user=user, recipe_id__in=recipe_ids).values_list('recipe_id', flat=True)
+    saved = SavedRecipe.objects.filter(user=user, recipe_id__in=recipe_ids).values_list('recipe_id', flat=True)
+    followed = Follow.objects.filter(follower=user, followed_id__in=author_ids).values_list('followed_id', flat=True)
+    return {pk async for pk in liked}, {pk async for pk in saved}, {pk async for pk in followed}
+
+
+def apply_viewer_state(items, user):
+    liked, saved, followed = get_viewer_state(
+        user, {item['id'] for item in items}, {item['author'] for item in items}
+    )
+    return set_viewer_state(items, liked, saved, followed)
+
+
+async def aapply_viewer_state(items, user):
+    liked, saved, followed = await aget_viewer_state(
+        user, {item['id'] for item in items}, {item['author'] for item in items}
+    )
+    return set_viewer_state(items, liked, saved, followed)
+
+
+def set_viewer_state(items, liked, saved, followed):
+    return [
+        {
+            **item,
+            'is_liked': item['id'] in liked,
+            'is_saved': item['id'] in saved,
+            'author_followed': item['author'] in followed,
+        }
+        for item in items
+    ]
+
+
+class ViewerStateMixin:
+    """
+    Add the viewer's `is_liked`, `is_saved` and `author_followed` flags to serialized recipes.
+
+    The flags are applied to the final response data, after the response cache, so cached
+    entries stay shared between users. ETags are suffixed with the viewer and their version
+    stamp, so a validator never revalidates another viewer's or an outdated set of flags.
+    """
+
+    def get_etag_suffix(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return '.u0'
+        # Likes and saves change the recipe's row version. Follows change the viewer's version stamp,
+        # already read by CachedJWTAuthentication (a cache read for other authentication classes).
+        version = getattr(user, 'cache_version', None) or get_version(user.pk)
+        return f'.u{user.pk}-{version}'
+
+    def get(self, request, *args, **kwargs):
+        suffix = self.get_etag_suffix()
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and if_none_match.strip() != '*':
+            # Inner layers compare viewer independent ETags; keep only this viewer's ones.
+            etags = [
+                etag.removeprefix('W/')[1:-1].removesuffix(suffix)
+                for etag in parse_etags(if_none_match)
+                if etag.removeprefix('W/').endswith(f'{suffix}"')
+            ]
+            if etags:
+                request.META['HTTP_IF_NONE_MATCH'] = ', '.join(f'"{etag}"' for etag in etags)
+            else:
+                del request.META['HTTP_IF_NONE_MATCH']
+
+        response = super().get(request, *args, **kwargs)
+        if response.has_header('ETag'):
+            response['ETag'] = f'{response["ETag"][:-1]}{suffix}"'
+        patch_vary_headers(response, ['Authorization'])
+        if response.status_code == 200:
+            response.data = self.add_viewer_state(response.data)
+        return response
+
+    def add_viewer_state(self, data):
+        user = self.request.user
+        if isinstance(data, dict) and 'results' in data:
+            return {**data, 'results': apply_viewer_state(data['results'], user)}
+        if isinstance(data, list):
+            return apply_viewer_state(data, user)
+        return apply_viewer_state([data], user)[0]
@@ -0,0 +1,126 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import (
+    APIException, AuthenticationFailed, MethodNotAllowed, NotAuthenticated, NotFound, ValidationError,
+)
+from rest_framework.request import Request
+from authentication.authentication import CachedJWTAuthentication
+from cooks_corner import relations
+from cooks_corner.filters import RecipeFilter
+from cooks_corner.models import Recipe
+from cooks_corner.pagination import CustomPagination
+from cooks_corner.query_plans import plan_queryset
+from cooks_corner.serializers import (
+    FollowSerializer,
+    LikedRecipeSerializer,
+    RecipeListSerializer,
+    RecipeSerializer,
+    SavedRecipeSerializer,
+)
+from cooks_corner.viewer_state import aapply_viewer_state
+
+
+# Async (ASGI) variants of the hot endpoints, mounted under /cookscorner/async/. They take the same
+# parameters and answer with the same bodies as their DRF counterparts (page or cursor pagination
+# included) but skip the response cache and conditional GETs; under ASGI a waiting request holds no
+# worker thread, only the ORM calls do. That buys idle connections, not throughput: see
+# docs/async-benchmark.md.
+
+async def authenticate(request):
+    result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    return result[0] if result else AnonymousUser()
+
+
+def async_api_view(methods, allow_anonymous=False):
+    """
+    Wrap an async view with what the DRF views get from APIView: method check, JWT
+    authentication (required unless `allow_anonymous`, like IsAuthenticatedOrReadOnly on
+    the GET-only views) and APIException -> JSON error response.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+                request.user = await authenticate(request)
+                if not request.user.is_authenticated and not allow_anonymous:
+                    raise NotAuthenticated()
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+                response = JsonResponse(detail, status=exc.status_code, safe=False)
+                if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                    response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(request)
+                return response
+        return wrapper
+    return decorator
+
+
+class RecipeListOptions:
+    # What DjangoFilterBackend and CustomPagination read from a view.
+    filterset_class = RecipeFilter
+    cursor_ordering = ('id',)
+
+
+@async_api_view(['GET'])
+async def recipe_list(request):
+    drf_request = Request(request)
+    drf_request.user = request.user
+    # Filter methods may inspect the database backend, so the filterset is applied in a thread.
+    queryset = await sync_to_async(DjangoFilterBackend().filter_queryset)(
+        drf_request, Recipe.objects.order_by('id'), RecipeListOptions
+    )
+    paginator = CustomPagination()
+    page = await paginator.apaginate_queryset(
+        plan_queryset(queryset, RecipeListSerializer), drf_request, RecipeListOptions
+    )
+    data = RecipeListSerializer(page, many=True, context={'request': request}).data
+    return JsonResponse(paginator.get_paginated_data(await aapply_viewer_state(data, request.user)))
+
+
+@async_api_view(['GET'], allow_anonymous=True)
+async def recipe_detail(request, pk):
+    recipe = await plan_queryset(Recipe.objects.filter(pk=pk), RecipeSerializer).afirst()
+    if recipe is None:
+        raise NotFound()
+    data = RecipeSerializer(recipe, context={'request': request}).data
+    return JsonResponse((await aapply_viewer_state([data], request.user))[0])
+
+
+def relation_view(relation, serializer_class, exists_message, missing_message):
+    """
+    POST adds the (request.user, target) row, DELETE removes it.
+    """
+    @async_api_view(['POST', 'DELETE'])
+    async def view(request, target_id):
+        if request.method == 'DELETE':
+            if not await sync_to_async(relation.remove)(request.user, target_id):
+                return JsonResponse({'error': missing_message}, status=404)
+            return HttpResponse(status=204)
+
+        if not await relation.target_model.objects.filter(pk=target_id).aexists():
+            raise NotFound()
+        try:
+            instance = await sync_to_async(relation.add)(request.user, target_id)
+        except IntegrityError:
+            raise ValidationError({'error': exists_message})
+        return JsonResponse(serializer_class(instance).data, status=201)
+    return view
+
+
+like_recipe = relation_view(
+    relations.likes, LikedRecipeSerializer, 'You have already liked this recipe.', 'Liked recipe not found.'
+)
+save_recipe = relation_view(
+    relations.saves, SavedRecipeSerializer, 'You have already saved this recipe.', 'Saved recipe not found.'
+)
+follow_user = relation_view(
+    relations.follows, FollowSerializer, 'You have already followed this author.', 'Follow author not found.'
+)
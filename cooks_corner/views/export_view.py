@@ -0,0 +1,39 @@
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from cooks_corner import export
+
+
+class ExportView(generics.GenericAPIView):
+    """
+    Data export.
+
+    Data export. This endpoint provides all rows of `recipes`, `likes`, `saves` or `follows` as NDJSON (default) or CSV (`?output=csv`), for admins only. With `?since=<datetime>` only rows changed after it are exported; the X-Export-Until header holds the `since` of the next incremental export.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+    # `format` is taken by the DRF renderer override.
+    output_query_param = 'output'
+
+    def get(self, request, dataset, *args, **kwargs):
+        if dataset not in export.DATASETS:
+            raise Http404
+        output = request.query_params.get(self.output_query_param, export.NDJSON)
+        if output not in export.ENCODERS:
+            raise ValidationError({self.output_query_param: f'One of: {", ".join(export.ENCODERS)}.'})
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = export.parse_since(since)
+            except ValueError as e:
+                raise ValidationError({'since': str(e)})
+
+        until = timezone.now()
+        response = StreamingHttpResponse(
+            export.stream(dataset, output, since or None, until), content_type=export.CONTENT_TYPES[output],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{dataset}-{until:%Y%m%dT%H%M%S}.{output}"'
+        response['X-Export-Until'] = until.isoformat()
+        return response
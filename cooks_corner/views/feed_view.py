@@ -0,0 +1,38 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+from cooks_corner import feed
+from cooks_corner.models import Recipe
+from cooks_corner.pagination import KEYSET_PARAMETERS, KeysetPagination
+from cooks_corner.query_plans import QueryPlanMixin
+from cooks_corner.serializers import RecipeListSerializer
+from cooks_corner.viewer_state import ViewerStateMixin
+
+
+class FeedView(ViewerStateMixin, QueryPlanMixin, generics.ListAPIView):
+    """
+    Feed of the followed cooks.
+
+    Feed of the followed cooks. This endpoint provides recipes of the followed users, newest first, with cursor pagination.
+    """
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeListSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-id',)
+
+    @swagger_auto_schema(manual_parameters=KEYSET_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Narrow the page to timeline candidates first so the recipe table is never scanned.
+        position, reverse = self.paginator.peek_cursor(self.request, queryset, self)
+        candidate_ids = feed.get_candidate_ids(
+            self.request.user,
+            position=position[0] if position else None,
+            reverse=reverse,
+            limit=self.paginator.get_page_size(self.request) + 1,
+        )
+        return queryset.filter(pk__in=candidate_ids)
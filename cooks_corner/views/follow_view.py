@@ -1,6 +1,15 @@
 from django.db import IntegrityError
-from django.shortcuts import get_object_or_404
+from drf_yasg.utils import swagger_auto_schema
+from django_filters.rest_framework import DjangoFilterBackend
+from authentication.models import User
 from cooks_corner.models import Follow
+from cooks_corner import feed, relations
+from cooks_corner.batch import BatchRelationView
+from cooks_corner.filters import FollowFilter
+from cooks_corner.pagination import KEYSET_PARAMETERS, KeysetPagination
+from cooks_corner.query_plans import QueryPlanMixin
+from cooks_corner.views.mixins import OwnerScopeMixin
+from cooks_corner.counters import sync_counters
 from cooks_corner.serializers import FollowListSerializer, FollowSerializer
 from rest_framework import generics, status, serializers
 from rest_framework.permissions import IsAuthenticated
@@ -8,15 +17,24 @@ from rest_framework.response import Response
 from authentication.permissions import IsOwnerOrReadOnly
 
 
-class FollowListView(generics.ListAPIView):
+class FollowListView(OwnerScopeMixin, QueryPlanMixin, generics.ListAPIView):
     """
     Following profiles list.
 
-    Following profiles list. This endpoint send list of the following paars.
+    Following profiles list. This endpoint send list of the following paars of the current user, newest first, with cursor pagination. Filter by `follower_id` or `followed_id` to list other users' paars.
     """
     queryset = Follow.objects.all()
     serializer_class = FollowListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-followed_on',)
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = FollowFilter
+    owner_field = 'follower'
+
+    @swagger_auto_schema(manual_parameters=KEYSET_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class FollowCreateView(generics.CreateAPIView):
@@ -31,7 +49,7 @@ class FollowCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         try:
-            serializer.save(follower=self.request.user)
+            serializer.instance = relations.follows.add(self.request.user, serializer.validated_data['followed'].pk)
         except IntegrityError:
             raise serializers.ValidationError({"error": "You have already followed this author."})
 
@@ -47,14 +65,30 @@ class FollowDestroyView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
 
     def delete(self, request, *args, **kwargs):
-        follower = self.request.user
-        followed_id = kwargs.get('followed_id')
-
         try:
-            liked_recipe = get_object_or_404(Follow, follower=follower, followed_id=followed_id)
-            liked_recipe.delete()
+            if not relations.follows.remove(request.user, kwargs.get('followed_id')):
+                return Response({"error": "Follow author not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response(status=status.HTTP_204_NO_CONTENT)
-        except Follow.DoesNotExist:
-            return Response({"error": "Follow author not found."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class FollowBatchView(BatchRelationView):
+    """
+    Follow and unfollow users in batch.
+
+    Follow and unfollow users in batch. This endpoint provides to follow (`add`) and unfollow (`remove`) many users in one request and reports the outcome per user.
+    """
+    model = Follow
+    target_model = User
+    owner_field = 'follower'
+    target_field = 'followed'
+
+    def on_changed(self, created, deleted):
+        follower = self.request.user
+        sync_counters(User, User.objects.filter(pk__in=created + deleted), ['followers_count'])
+        sync_counters(User, User.objects.filter(pk=follower.pk), ['following_count'])
+        for followed_id in created:
+            feed.backfill_follow(follower.pk, followed_id)
+        for followed_id in deleted:
+            feed.remove_follow(follower.pk, followed_id)
@@ -1,6 +1,15 @@
 from django.db import IntegrityError
-from django.shortcuts import get_object_or_404
-from cooks_corner.models import LikedRecipe
+from drf_yasg.utils import swagger_auto_schema
+from django_filters.rest_framework import DjangoFilterBackend
+from cooks_corner.models import Recipe, LikedRecipe
+from cooks_corner import relations
+from cooks_corner.batch import BatchRelationView
+from cooks_corner.cache import invalidate_recipes
+from cooks_corner.filters import LikedRecipeFilter
+from cooks_corner.pagination import KEYSET_PARAMETERS, KeysetPagination
+from cooks_corner.query_plans import QueryPlanMixin
+from cooks_corner.views.mixins import OwnerScopeMixin
+from cooks_corner.counters import sync_counters
 from cooks_corner.serializers import LikedRecipeListSerializer, LikedRecipeSerializer
 from rest_framework import generics, status, serializers
 from rest_framework.permissions import IsAuthenticated
@@ -8,15 +17,23 @@ from rest_framework.response import Response
 from authentication.permissions import IsOwnerOrReadOnly
 
 
-class LikedRecipeListView(generics.ListAPIView):
+class LikedRecipeListView(OwnerScopeMixin, QueryPlanMixin, generics.ListAPIView):
     """
     Liked profiles list.
 
-    Liked profiles list. This endpoint send list of the liking paars.
+    Liked profiles list. This endpoint send list of the liking paars of the current user, newest first, with cursor pagination. Filter by `user_id` or `recipe_id` to list other users' paars.
     """
     queryset = LikedRecipe.objects.all()
     serializer_class = LikedRecipeListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-liked_on',)
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = LikedRecipeFilter
+
+    @swagger_auto_schema(manual_parameters=KEYSET_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class LikedRecipeCreateView(generics.CreateAPIView):
@@ -31,7 +48,7 @@ class LikedRecipeCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         try:
-            serializer.save(user=self.request.user)
+            serializer.instance = relations.likes.add(self.request.user, serializer.validated_data['recipe'].pk)
         except IntegrityError:
             raise serializers.ValidationError({"error": "You have already liked this recipe."})
 
@@ -47,14 +64,26 @@ class LikedRecipeDestroyView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
 
     def delete(self, request, *args, **kwargs):
-        user = request.user
-        recipe_id = kwargs.get('recipe_id')
-
         try:
-            liked_recipe = get_object_or_404(LikedRecipe, user=user, recipe_id=recipe_id)
-            liked_recipe.delete()
+            if not relations.likes.remove(request.user, kwargs.get('recipe_id')):
+                return Response({"error": "Liked recipe not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response(status=status.HTTP_204_NO_CONTENT)
-        except LikedRecipe.DoesNotExist:
-            return Response({"error": "Liked recipe not found."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class LikedRecipeBatchView(BatchRelationView):
+    """
+    Like and unlike recipes in batch.
+
+    Like and unlike recipes in batch. This endpoint provides to like (`add`) and unlike (`remove`) many recipes in one request and reports the outcome per recipe.
+    """
+    model = LikedRecipe
+    target_model = Recipe
+    owner_field = 'user'
+    target_field = 'recipe'
+
+    def on_changed(self, created, deleted):
+        recipe_ids = created + deleted
+        sync_counters(Recipe, Recipe.objects.filter(pk__in=recipe_ids), ['likes_count'])
+        invalidate_recipes(*recipe_ids)
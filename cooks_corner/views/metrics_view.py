@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+from cooks_corner.metrics import render_metrics
+
+
+class MetricsView(generics.GenericAPIView):
+    """
+    Prometheus metrics.
+
+    Prometheus metrics. This endpoint provides request counts, latency and SQL query histograms per URL name, for admins only.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,15 @@
+class OwnerScopeMixin:
+    """
+    List view mixin showing the requesting user's own rows (`owner_field`) unless one of
+    the filterset's filters is given, e.g. `?user_id=` or `?recipe_id=`.
+    """
+    owner_field = 'user'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'swagger_fake_view', False):
+            return queryset.none()
+        params = self.request.query_params
+        if not any(params.get(name) for name in self.filterset_class.base_filters):
+            queryset = queryset.filter(**{self.owner_field: self.request.user})
+        return queryset
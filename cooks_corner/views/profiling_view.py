@@ -0,0 +1,43 @@
+from django.http import FileResponse, Http404
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from cooks_corner.profiling import get_profile_storage
+
+
+class ProfileListView(generics.GenericAPIView):
+    """
+    Stored request profiles.
+
+    Stored request profiles. This endpoint provides the profiles recorded by the profiling middleware, newest first, for admins only.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        storage = get_profile_storage()
+        if not storage.exists(''):
+            return Response({'results': []})
+        _, names = storage.listdir('')
+        return Response({'results': [
+            {'name': name, 'size': storage.size(name), 'url': request.build_absolute_uri(f'{name}/')}
+            for name in sorted(names, reverse=True)
+        ]})
+
+
+class ProfileDownloadView(generics.GenericAPIView):
+    """
+    Download a request profile.
+
+    Download a request profile. This endpoint provides a stored profile: pstats (`.prof`) or collapsed stacks (`.collapsed`), for admins only.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        storage = get_profile_storage()
+        name = kwargs['name']
+        _, names = storage.listdir('') if storage.exists('') else ([], [])
+        if name not in names:
+            raise Http404
+        return FileResponse(storage.open(name), as_attachment=True, filename=name)
@@ -1,19 +1,28 @@
 from drf_yasg import openapi
 from rest_framework import  generics, status, permissions
 from drf_yasg.utils import swagger_auto_schema
+from django.db.models.functions import Greatest
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from authentication.permissions import IsOwnerOrReadOnly
-from cooks_corner.models import Recipe, Category, RecipeImage
-from cooks_corner.pagination import CustomPagination
+from cooks_corner import images, ingredient_index, search
+from cooks_corner.cache import CachedResponseMixin, LIST_NAMESPACE, recipe_namespace
+from cooks_corner.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from cooks_corner.viewer_state import ViewerStateMixin
+from cooks_corner.models import Recipe, Category, RecipeImage, TrendingScore
+from cooks_corner.pagination import (
+    CURSOR_PARAMETER, KEYSET_PARAMETERS, PAGE_PARAMETERS, PAGINATION_PARAMETER, CustomPagination, KeysetPagination,
+)
 from cooks_corner.filters import RecipeFilter
+from cooks_corner.query_plans import QueryPlanMixin, plan_queryset
 from cooks_corner.serializers import (
     RecipeSerializer, 
     CategorySerializer, 
     RecipeListSerializer, 
     RecipeImageSerializer,
+    IngredientMatchSerializer,
 )
 
 
@@ -29,19 +38,21 @@ class CategoryList(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class RecipeListView(generics.ListAPIView):
+class RecipeListView(ViewerStateMixin, CachedResponseMixin, ConditionalListMixin, QueryPlanMixin, generics.ListAPIView):
     """
     List of the recipes.
 
     List of the recipes. This endpoint provides to get list of recipes with following fillters.
     """
-    queryset = Recipe.objects.all().order_by('id') 
+    queryset = Recipe.objects.all().order_by('id')
     serializer_class = RecipeListSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = CustomPagination
+    cursor_ordering = ('id',)
     parser_classes = (MultiPartParser, FormParser)
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
+    cache_name = 'recipes-list'
 
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('title', openapi.IN_QUERY, description="Title", type=openapi.TYPE_STRING),
@@ -50,24 +61,143 @@ class RecipeListView(generics.ListAPIView):
         openapi.Parameter('category_id', openapi.IN_QUERY, description="Category ID", type=openapi.TYPE_INTEGER),
         openapi.Parameter('category_name', openapi.IN_QUERY, description="Category Name", type=openapi.TYPE_STRING),
         openapi.Parameter('saved_by_user', openapi.IN_QUERY, description="Saved by User", type=openapi.TYPE_BOOLEAN),
-        openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
-        openapi.Parameter('limit', openapi.IN_QUERY, description="Number of results to return per page", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('search', openapi.IN_QUERY, description="Full-text search over title, description and ingredients", type=openapi.TYPE_STRING),
+        *PAGE_PARAMETERS,
+        PAGINATION_PARAMETER,
+        CURSOR_PARAMETER,
     ])
     def get(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
+        return super().get(request, *args, **kwargs)
 
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_row_version(self, obj):
+        # author_name is part of every row
+        return obj.pk, obj.updated_at, obj.author.updated_at
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    
     def get_filterset(self, *args, **kwargs):
         kwargs['request'] = self.request
         return super().get_filterset(*args, **kwargs)
 
+    def get_cache_namespaces(self):
+        return [LIST_NAMESPACE]
+
+    def get_cache_variant(self):
+        params = sorted(self.request.query_params.lists())
+        # saved_by_user depends on who is asking, every other filter does not.
+        if 'saved_by_user' in self.request.query_params:
+            params.append(('user', [str(self.request.user.pk)]))
+        return repr(params)
+
+
+class RecipeSearchView(ViewerStateMixin, QueryPlanMixin, generics.ListAPIView):
+    """
+    Search of the recipes.
+
+    Search of the recipes. This endpoint provides full-text search over title, description and ingredients, best matches first.
+    """
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CustomPagination
+    # Results are ordered by rank, which the keyset cursor cannot page on.
+    cursor_ordering = None
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, description="Search query", type=openapi.TYPE_STRING, required=True),
+        *PAGE_PARAMETERS,
+    ])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'swagger_fake_view', False):
+            return queryset.none()
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            return queryset.none()
+        return search.search_recipes(queryset, query)
+
+
+class TrendingRecipeListView(ViewerStateMixin, generics.ListAPIView):
+    """
+    Trending recipes.
+
+    Trending recipes. This endpoint provides recipes ranked by their recent likes and saves, with cursor pagination.
+    """
+    # Pages are read from the ranking table maintained by `manage.py update_trending_scores`.
+    queryset = TrendingScore.objects.all()
+    serializer_class = RecipeListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-score',)
+
+    @swagger_auto_schema(manual_parameters=KEYSET_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        recipe_ids = [score.recipe_id for score in page]
+        recipes = plan_queryset(Recipe.objects.filter(pk__in=recipe_ids), self.get_serializer_class()).in_bulk()
+        serializer = self.get_serializer([recipes[pk] for pk in recipe_ids if pk in recipes], many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class SimilarRecipeListView(ViewerStateMixin, QueryPlanMixin, generics.ListAPIView):
+    """
+    Similar recipes.
+
+    Similar recipes. This endpoint provides the recipes most often liked or saved by the users who liked or saved this one, most similar first.
+    """
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Bounded by SIMILAR_RECIPES_COUNT, precomputed by `manage.py update_similar_recipes`.
+    pagination_class = None
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Recipe.objects.none()
+        return super().get_queryset().filter(similar_to__recipe_id=self.kwargs['pk']).order_by('-similar_to__score')
+
+
+class RecipeByIngredientsView(ViewerStateMixin, generics.ListAPIView):
+    """
+    Recipes by ingredients.
+
+    Recipes by ingredients. This endpoint provides the recipes using the given ingredients, those using most of them and missing fewest others first.
+    """
+    serializer_class = IngredientMatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CustomPagination
+    # Results are ranked in memory, the keyset cursor cannot page on that.
+    cursor_ordering = None
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('ingredients', openapi.IN_QUERY, description="Comma-separated ingredient names", type=openapi.TYPE_STRING, required=True),
+        *PAGE_PARAMETERS,
+    ])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        names = [name for name in request.query_params.get('ingredients', '').split(',') if name.strip()]
+        index = ingredient_index.get_index()
+        page = self.paginate_queryset(index.search(names) if names else [])
+
+        recipes = plan_queryset(Recipe.objects.filter(pk__in=[row[0] for row in page]), self.serializer_class).in_bulk()
+        results = []
+        for recipe_id, matched, missing in page:
+            recipe = recipes.get(recipe_id)
+            if recipe is None:
+                # Deleted by another process since the index was refreshed.
+                index.remove_recipe(recipe_id)
+                continue
+            recipe.matched_ingredients, recipe.missing_ingredients = matched, missing
+            results.append(recipe)
+        serializer = self.get_serializer(results, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class RecipeCreateView(generics.CreateAPIView):
     """
@@ -87,7 +217,7 @@ class RecipeCreateView(generics.CreateAPIView):
             return Response({"error": f'Error occurred while creating the recipe: {e}'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class RecipeDetailView(generics.RetrieveAPIView):
+class RecipeDetailView(ViewerStateMixin, CachedResponseMixin, ConditionalRetrieveMixin, QueryPlanMixin, generics.RetrieveAPIView):
     """
     Detail of the recipe.
 
@@ -96,6 +226,18 @@ class RecipeDetailView(generics.RetrieveAPIView):
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]  # Разрешение на чтение для всех, редактирование и удаление для аутентифицированных пользователей
+    cache_name = 'recipe-detail'
+
+    def get_cache_namespaces(self):
+        return [recipe_namespace(self.kwargs['pk'])]
+
+    def get_object_version(self):
+        # Following the author changes author_followed, so the author's row version counts too.
+        return (
+            Recipe.objects.filter(pk=self.kwargs['pk'])
+            .values_list(Greatest('updated_at', 'author__updated_at'), 'updated_at', 'author__updated_at', 'id')
+            .first()
+        )
 
     def perform_update(self, serializer):
         serializer.save()
@@ -113,4 +255,10 @@ class RecipeImageCreateView(generics.CreateAPIView):
     queryset = RecipeImage.objects.all()
     serializer_class = RecipeImageSerializer
     parser_classes = (MultiPartParser, FormParser)
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+
+    def perform_create(self, serializer):
+        # Only staged here; validation, EXIF stripping, resizing and the upload run in the worker pool.
+        staged_name = images.stage_upload(serializer.validated_data.pop('image'), 'recipe_images')
+        recipe_image = serializer.save(status=RecipeImage.PENDING, staged_file=staged_name)
+        images.enqueue(images.ingest_recipe_image, recipe_image.pk)
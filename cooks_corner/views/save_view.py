@@ -1,6 +1,15 @@
 from django.db import IntegrityError
-from django.shortcuts import get_object_or_404
-from cooks_corner.models import SavedRecipe
+from drf_yasg.utils import swagger_auto_schema
+from django_filters.rest_framework import DjangoFilterBackend
+from cooks_corner.models import Recipe, SavedRecipe
+from cooks_corner import relations
+from cooks_corner.batch import BatchRelationView
+from cooks_corner.cache import invalidate_recipes
+from cooks_corner.filters import SavedRecipeFilter
+from cooks_corner.pagination import KEYSET_PARAMETERS, KeysetPagination
+from cooks_corner.query_plans import QueryPlanMixin
+from cooks_corner.views.mixins import OwnerScopeMixin
+from cooks_corner.counters import sync_counters
 from cooks_corner.serializers import SavedRecipeListSerializer, SavedRecipeSerializer
 from rest_framework import generics, status, serializers
 from rest_framework.permissions import IsAuthenticated
@@ -8,15 +17,23 @@ from rest_framework.response import Response
 from authentication.permissions import IsOwnerOrReadOnly
 
 
-class SavedRecipeListView(generics.ListAPIView):
+class SavedRecipeListView(OwnerScopeMixin, QueryPlanMixin, generics.ListAPIView):
     """
     Saved recipe list.
 
-    Saved recipe list. This endpoint send list of the saved paars.
+    Saved recipe list. This endpoint send list of the saved paars of the current user, newest first, with cursor pagination. Filter by `user_id` or `recipe_id` to list other users' paars.
     """
     queryset = SavedRecipe.objects.all()
     serializer_class = SavedRecipeListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-saved_on',)
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = SavedRecipeFilter
+
+    @swagger_auto_schema(manual_parameters=KEYSET_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class SavedRecipeCreateView(generics.CreateAPIView):
@@ -31,7 +48,7 @@ class SavedRecipeCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         try:
-            serializer.save(user=self.request.user)
+            serializer.instance = relations.saves.add(self.request.user, serializer.validated_data['recipe'].pk)
         except IntegrityError:
             raise serializers.ValidationError({"error": "You have already saved this recipe."})
 
@@ -47,14 +64,26 @@ class SavedRecipeDestroyView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
 
     def delete(self, request, *args, **kwargs):
-        user = request.user
-        recipe_id = kwargs.get('recipe_id')
-
         try:
-            liked_recipe = get_object_or_404(SavedRecipe, user=user, recipe_id=recipe_id)
-            liked_recipe.delete()
+            if not relations.saves.remove(request.user, kwargs.get('recipe_id')):
+                return Response({"error": "Saved recipe not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response(status=status.HTTP_204_NO_CONTENT)
-        except SavedRecipe.DoesNotExist:
-            return Response({"error": "Saved recipe not found."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SavedRecipeBatchView(BatchRelationView):
+    """
+    Save and unsave recipes in batch.
+
+    Save and unsave recipes in batch. This endpoint provides to save (`add`) and unsave (`remove`) many recipes in one request and reports the outcome per recipe.
+    """
+    model = SavedRecipe
+    target_model = Recipe
+    owner_field = 'user'
+    target_field = 'recipe'
+
+    def on_changed(self, created, deleted):
+        recipe_ids = created + deleted
+        sync_counters(Recipe, Recipe.objects.filter(pk__in=recipe_ids), ['saves_count'])
+        invalidate_recipes(*recipe_ids)
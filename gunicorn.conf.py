@@ -0,0 +1,12 @@
+# Read by gunicorn from the working directory, for both the WSGI and the ASGI (uvicorn worker) services.
+
+
+def post_worker_init(worker):
+    # Per-process state is built before the worker accepts requests, rather than by the first one.
+    from django.db import connections
+    from authentication.blacklist import get_filter
+
+    blacklist = get_filter()
+    worker.log.info('Blacklist filter built: %d token(s)', blacklist.count)
+    # Requests may run on other threads (ASGI); do not keep this thread's connection open.
+    connections.close_all()